@@ -0,0 +1,161 @@
+"""
+File: avlbst.py
+An AVL tree: a linked binary search tree which keeps itself balanced.
+"""
+
+from binary_search_tree.linkedbst import LinkedBST, _size
+from binary_search_tree.bstnode import BSTNode
+
+
+def _height(node):
+    """Returns the number of levels of the subtree, 0 for None."""
+    if node is None:
+        return 0
+    return node.height
+
+
+class AVLTree(LinkedBST):
+    """A binary search tree whose subtrees differ in height by at most 1
+    at every node, so that its height stays O(log n) whatever the order
+    of additions and removals. Every node keeps the height of its subtree,
+    and its size too if the tree is made with keepSizes."""
+
+    def height(self):
+        """Returns the height of the tree."""
+        if self.isEmpty():
+            return 0
+        return self._root.height - 1
+
+    # Mutator methods
+    def add(self, item):
+        """Adds item to the tree."""
+        if self.isEmpty():
+            self._root = BSTNode(item)
+            self._size += 1
+            return
+        # Descend to the spot of the new item, remembering the path
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
+            if self._keepSizes:
+                node.size += 1
+            if item < node.data:
+                node = node.left
+            else:
+                node = node.right
+        parent = path[-1]
+        if item < parent.data:
+            parent.left = BSTNode(item)
+        else:
+            parent.right = BSTNode(item)
+        self._size += 1
+        self._rebalancePath(path)
+
+    def remove(self, item):
+        """Precondition: item is in self.
+        Raises: KeyError if item is not in self.
+        postcondition: item is removed from self."""
+        path = []
+        node = self._root
+        while node is not None and node.data != item:
+            path.append(node)
+            if item < node.data:
+                node = node.left
+            else:
+                node = node.right
+        if node is None:
+            raise KeyError("Item not in tree.")
+        itemRemoved = node.data
+
+        # A node with two children takes the maximum of its left subtree,
+        # whose node has no right child and is removed instead
+        if node.left is not None and node.right is not None:
+            path.append(node)
+            top = node
+            node = node.left
+            while node.right is not None:
+                path.append(node)
+                node = node.right
+            top.data = node.data
+        if self._keepSizes:
+            for pathNode in path:
+                pathNode.size -= 1
+        newChild = node.left if node.left is not None else node.right
+        self._replaceChild(path[-1] if path else None, node, newChild)
+        self._size -= 1
+        self._rebalancePath(path)
+        return itemRemoved
+
+    # Helper methods
+    def _replaceChild(self, parent, child, newChild):
+        """Links newChild to parent in place of child, or makes it the root
+        if parent is None."""
+        if parent is None:
+            self._root = newChild
+        elif parent.left is child:
+            parent.left = newChild
+        else:
+            parent.right = newChild
+
+    def _rebalancePath(self, path):
+        """Updates heights and restores balance of the nodes of path, a
+        list of nodes from the root down, going up from the last one."""
+        for index in range(len(path) - 1, -1, -1):
+            node = path[index]
+            oldHeight = node.height
+            top = self._balance(node)
+            if top is node and top.height == oldHeight:
+                # Nothing above has changed
+                return
+            if top is not node:
+                self._replaceChild(path[index - 1] if index else None, node, top)
+
+    def _balance(self, node):
+        """Updates the height of node and rotates its subtree if it is out
+        of balance. Returns the new top of the subtree."""
+        balance = _height(node.left) - _height(node.right)
+        if balance > 1:
+            if _height(node.left.left) < _height(node.left.right):
+                node.left = self._rotateLeft(node.left)
+            return self._rotateRight(node)
+        if balance < -1:
+            if _height(node.right.right) < _height(node.right.left):
+                node.right = self._rotateRight(node.right)
+            return self._rotateLeft(node)
+        self._update(node)
+        return node
+
+    def _update(self, node):
+        """Sets the height, and the size if it is kept, of the subtree of
+        node from those of its children."""
+        node.height = max(_height(node.left), _height(node.right)) + 1
+        if self._keepSizes:
+            node.size = _size(node.left) + _size(node.right) + 1
+
+    def _rotateLeft(self, node):
+        """Lifts the right child of node over it, returns the child."""
+        top = node.right
+        node.right = top.left
+        top.left = node
+        self._update(node)
+        self._update(top)
+        return top
+
+    def _rotateRight(self, node):
+        """Lifts the left child of node over it, returns the child."""
+        top = node.left
+        node.left = top.right
+        top.right = node
+        self._update(node)
+        self._update(top)
+        return top
+
+
+if __name__ == "__main__":
+    tree = AVLTree(range(1, 16))
+    print("Added 1..15:\n" + str(tree))
+    print("balanced?", tree.isBalanced())
+    for item in range(1, 16, 2):
+        tree.remove(item)
+    print("Removed odd items:\n" + str(tree))
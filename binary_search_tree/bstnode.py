@@ -9,4 +9,9 @@ class BSTNode(object):
     def __init__(self, data, left = None, right = None):
         self.data = data
         self.left = left
-        self.right = right
\ No newline at end of file
+        self.right = right
+        # Number of levels of the subtree rooted here, kept by AVLTree.
+        self.height = 1
+        # Number of nodes of the subtree rooted here, kept by trees made
+        # with keepSizes.
+        self.size = 1
\ No newline at end of file
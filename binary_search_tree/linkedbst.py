@@ -7,16 +7,30 @@ from binary_search_tree.abstractcollection import AbstractCollection
 from binary_search_tree.bstnode import BSTNode
 from binary_search_tree.linkedstack import LinkedStack
 from binary_search_tree.linkedqueue import LinkedQueue
+from itertools import islice
 from math import log
 
 
+def _size(node):
+    """Returns the number of nodes of the subtree, 0 for None."""
+    if node is None:
+        return 0
+    return node.size
+
+
 class LinkedBST(AbstractCollection):
-    """An link-based binary search tree implementation."""
+    """An link-based binary search tree implementation.
+
+    With keepSizes every node keeps the size of its subtree, at the cost
+    of one more update per node on the path of every add and remove. It
+    makes rank, select, count_range, num_children and the offset of
+    rangeIter O(log n) on balanced trees instead of O(n)."""
 
-    def __init__(self, sourceCollection=None):
+    def __init__(self, sourceCollection=None, keepSizes=False):
         """Sets the initial state of self, which includes the
         contents of sourceCollection, if it's present."""
         self._root = None
+        self._keepSizes = keepSizes
         AbstractCollection.__init__(self, sourceCollection)
 
     # Accessor methods
@@ -80,18 +94,15 @@ class LinkedBST(AbstractCollection):
     def find(self, item):
         """If item matches an item in self, returns the
         matched item, or None otherwise."""
-
-        def recurse(node):
-            if node is None:
-                return None
-            elif item == node.data:
+        node = self._root
+        while node is not None:
+            if item == node.data:
                 return node.data
             elif item < node.data:
-                return recurse(node.left)
+                node = node.left
             else:
-                return recurse(node.right)
-
-        return recurse(self._root)
+                node = node.right
+        return None
 
     # Mutator methods
     def clear(self):
@@ -102,60 +113,40 @@ class LinkedBST(AbstractCollection):
     def add(self, item):
         """Adds item to the tree."""
 
-        # Helper function to search for item's position
-        def recurse(node):
-            # New item is less, go left until spot is found
-            if item < node.data:
-                if node.left == None:
-                    node.left = BSTNode(item)
-                else:
-                    recurse(node.left)
-            # New item is greater or equal,
-            # go right until spot is found
-            elif node.right == None:
-                node.right = BSTNode(item)
-            else:
-                recurse(node.right)
-                # End of recurse
-
         # Tree is empty, so new item goes at the root
         if self.isEmpty():
             self._root = BSTNode(item)
         # Otherwise, search for the item's spot
         else:
-            recurse(self._root)
+            keepSizes = self._keepSizes
+            node = self._root
+            while True:
+                # The new item goes somewhere below node
+                if keepSizes:
+                    node.size += 1
+                # New item is less, go left until spot is found
+                if item < node.data:
+                    if node.left is None:
+                        node.left = BSTNode(item)
+                        break
+                    node = node.left
+                # New item is greater or equal,
+                # go right until spot is found
+                elif node.right is None:
+                    node.right = BSTNode(item)
+                    break
+                else:
+                    node = node.right
         self._size += 1
 
     def remove(self, item):
         """Precondition: item is in self.
         Raises: KeyError if item is not in self.
         postcondition: item is removed from self."""
-        if not item in self:
-            raise KeyError("Item not in tree.""")
-
-        # Helper function to adjust placement of an item
-        def liftMaxInLeftSubtreeToTop(top):
-            # Replace top's datum with the maximum datum in the left subtree
-            # Pre:  top has a left child
-            # Post: the maximum node in top's left subtree
-            #       has been removed
-            # Post: top.data = maximum value in top's left subtree
-            parent = top
-            currentNode = top.left
-            while not currentNode.right == None:
-                parent = currentNode
-                currentNode = currentNode.right
-            top.data = currentNode.data
-            if parent == top:
-                top.left = currentNode.left
-            else:
-                parent.right = currentNode.left
-
-        # Begin main part of the method
-        if self.isEmpty(): return None
 
         # Attempt to locate the node containing the item
         itemRemoved = None
+        path = []
         preRoot = BSTNode(None)
         preRoot.left = self._root
         parent = preRoot
@@ -166,6 +157,7 @@ class LinkedBST(AbstractCollection):
                 itemRemoved = currentNode.data
                 break
             parent = currentNode
+            path.append(currentNode)
             if currentNode.data > item:
                 direction = 'L'
                 currentNode = currentNode.left
@@ -173,10 +165,14 @@ class LinkedBST(AbstractCollection):
                 direction = 'R'
                 currentNode = currentNode.right
 
-        # Return None if the item is absent
-        if itemRemoved == None: return None
+        # Raise KeyError if the item is absent
+        if currentNode is None:
+            raise KeyError("Item not in tree.")
 
         # The item is present, so remove its node
+        if self._keepSizes:
+            for node in path:
+                node.size -= 1
 
         # Case 1: The node has a left and a right child
         #         Replace the node's value with the maximum value in the
@@ -184,7 +180,9 @@ class LinkedBST(AbstractCollection):
         #         Delete the maximium node in the left subtree
         if not currentNode.left == None \
                 and not currentNode.right == None:
-            liftMaxInLeftSubtreeToTop(currentNode)
+            if self._keepSizes:
+                currentNode.size -= 1
+            self._liftMaxInLeftSubtreeToTop(currentNode)
         else:
 
             # Case 2: The node has no left child
@@ -211,6 +209,25 @@ class LinkedBST(AbstractCollection):
             self._root = preRoot.left
         return itemRemoved
 
+    def _liftMaxInLeftSubtreeToTop(self, top):
+        """Replaces top's datum with the maximum datum in the left subtree.
+        Pre:  top has a left child
+        Post: the maximum node in top's left subtree
+              has been removed
+        Post: top.data = maximum value in top's left subtree"""
+        parent = top
+        currentNode = top.left
+        while not currentNode.right == None:
+            if self._keepSizes:
+                currentNode.size -= 1
+            parent = currentNode
+            currentNode = currentNode.right
+        top.data = currentNode.data
+        if parent == top:
+            top.left = currentNode.left
+        else:
+            parent.right = currentNode.left
+
     def replace(self, item, newItem):
         """
         If item is in self, replaces it with newItem and
@@ -233,21 +250,20 @@ class LinkedBST(AbstractCollection):
         :return: int
         '''
 
-        def height1(top):
-            '''
-            Helper function
-            :param top:
-            :return:
-            '''
-
-            if top is None:
-                return 0
-            amount = max(height1(top.left), height1(top.right))
-            return amount + 1
-
         if self.isEmpty():
             return 0
-        return height1(self._root) - 1
+        # Walk the tree with a stack of (node, level) pairs
+        result = 0
+        stack = [(self._root, 0)]
+        while stack:
+            node, level = stack.pop()
+            if level > result:
+                result = level
+            if node.left is not None:
+                stack.append((node.left, level + 1))
+            if node.right is not None:
+                stack.append((node.right, level + 1))
+        return result
 
     def isBalanced(self):
         '''
@@ -255,24 +271,16 @@ class LinkedBST(AbstractCollection):
         :return:
         '''
 
-        if (log(self._size + 1, 2) - 1 <= self.height()) and (self.height() <= log(self._size, 2)):
+        if self.isEmpty():
+            return True
+        height = self.height()
+        if (log(self._size + 1, 2) - 1 <= height) and (height <= log(self._size, 2)):
         #if (self.height()< 2*log(self._size+1)-1):
             return True
         return False
 
     def _tour(self):
-        lst = []
-
-        def node_tour(top, lst):
-            if top.left is not None:
-                lst = node_tour(top.left, lst)
-            lst.append(top.data)
-            if top.right is not None:
-                lst = node_tour(top.right, lst)
-            return lst
-
-        lst = node_tour(self._root, lst)
-        return lst
+        return [node.data for node in self._inorderNodes()]
 
     def rangeFind(self, low, high):
         '''
@@ -281,25 +289,71 @@ class LinkedBST(AbstractCollection):
         :param high:
         :return:
         '''
+        return list(self.rangeIter(low, high))
 
-        lst = []
-        if self.find(low) is None:
-            low = self.successor(low)
-        if self.find(high) is None:
-            high = self.predecessor(high)
-
-        def node_tour(top, lst):
-            if top.left is not None:
-                lst = node_tour(top.left, lst)
-            if low <= top.data and top.data <= high:
-                lst.append(top.data)
-            if top.right is not None:
-                lst = node_tour(top.right, lst)
-            return lst
-
-        lst = node_tour(self._root, lst)
+    def rangeIter(self, low, high, offset=0):
+        '''
+        Yields the items of the tree, where low <= item <= high, in order,
+        visiting only the subtrees which can hold them. The first offset
+        of those items are skipped, so the number of items yielded so far
+        is the cursor to resume a scan from, exact with repeated items as
+        long as the tree does not change between pages:
+            page = list(islice(tree.rangeIter(low, high, cursor), 100))
+            cursor += len(page)
+        Raises: ValueError if offset is negative.
+        :param low:
+        :param high:
+        :param offset:
+        :return:
+        '''
+        # Checked here rather than in the generator to fail at the call
+        if offset < 0:
+            raise ValueError("Offset must not be negative.")
+        return self._rangeIter(low, high, offset)
 
-        return lst
+    def _rangeIter(self, low, high, offset):
+        '''
+        Yields the items of rangeIter, offset being at least 0.
+        '''
+        stack = []
+        node = self._root
+        if self._keepSizes:
+            # Go down to the item with the index of the first one to yield,
+            # keeping the nodes whose items follow it on the stack
+            index = self.rank(low) + offset
+            offset = 0
+            while node is not None:
+                leftSize = _size(node.left)
+                if index < leftSize:
+                    stack.append(node)
+                    node = node.left
+                elif index == leftSize:
+                    stack.append(node)
+                    break
+                else:
+                    index -= leftSize + 1
+                    node = node.right
+        else:
+            # Go down to low, keeping the nodes whose items are not
+            # smaller on the stack, and skip offset items on the way up
+            while node is not None:
+                if node.data < low:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+        while stack:
+            node = stack.pop()
+            if high < node.data:
+                return
+            if offset:
+                offset -= 1
+            else:
+                yield node.data
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
 
     def rebalance(self):
         '''
@@ -308,20 +362,39 @@ class LinkedBST(AbstractCollection):
         '''
         if self.isBalanced():
             return
-        else:
-            lst = self._tour()
-            self.clear()
+        nodes = list(self._inorderNodes())
+        self._root = self._build(nodes, 0, len(nodes))
 
-            def simple_add(lst):
-                if not len(lst):
-                    return
-                first_part = lst[:len(lst) // 2]
-                second_part = lst[len(lst) // 2 + 1:]
-                self.add(lst[len(lst) // 2])
-                simple_add(first_part)
-                simple_add(second_part)
-
-            simple_add(lst)
+    def _inorderNodes(self):
+        '''
+        Yields the nodes of the tree in order, without recursion.
+        '''
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def _build(self, nodes, low, high):
+        '''
+        Links nodes[low:high], which are in order, into a balanced
+        subtree and returns its root. Heights and sizes of the nodes are
+        updated.
+        '''
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        node = nodes[middle]
+        node.left = self._build(nodes, low, middle)
+        node.right = self._build(nodes, middle + 1, high)
+        node.height = max(node.left.height if node.left else 0,
+                          node.right.height if node.right else 0) + 1
+        node.size = high - low
+        return node
 
     def successor(self, item):
         """
@@ -332,15 +405,15 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-        lst = self._tour()
-        i = 0
-        try:
-            while item >= lst[i]:
-                i += 1
-        except IndexError:
-            return
-
-        return lst[i]
+        result = None
+        node = self._root
+        while node is not None:
+            if item < node.data:
+                result = node.data
+                node = node.left
+            else:
+                node = node.right
+        return result
 
     def predecessor(self, item):
         """
@@ -351,23 +424,112 @@ class LinkedBST(AbstractCollection):
         :return:
         :rtype:
         """
-        lst = self._tour()
-        i = -1
-        try:
-            while item <= lst[i]:
-                i -= 1
-        except IndexError:
-            return
-
-        return lst[i]
+        result = None
+        node = self._root
+        while node is not None:
+            if node.data < item:
+                result = node.data
+                node = node.right
+            else:
+                node = node.left
+        return result
 
     def num_children(self, node):
-        def recurse(node):
-            if node is None:
-                return 0
+        '''
+        Returns the number of nodes below node, -1 for None.
+        '''
+        if self._keepSizes:
+            return _size(node) - 1
+        result = -1
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            result += 1
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        return result
+
+    def rank(self, item):
+        '''
+        Returns the number of items in the tree smaller than item.
+        :param item:
+        :return: int
+        '''
+        if not self._keepSizes:
+            return self._countWhile(lambda data: data < item)
+        result = 0
+        node = self._root
+        while node is not None:
+            if node.data < item:
+                result += _size(node.left) + 1
+                node = node.right
             else:
-                return 1 + recurse(node.left) + recurse(node.right)
-        return recurse(node) - 1
+                node = node.left
+        return result
+
+    def _countUpTo(self, item):
+        '''
+        Returns the number of items in the tree not greater than item.
+        '''
+        if not self._keepSizes:
+            return self._countWhile(lambda data: data <= item)
+        result = 0
+        node = self._root
+        while node is not None:
+            if node.data <= item:
+                result += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return result
+
+    def select(self, k):
+        '''
+        Returns the k-th smallest item, select(0) being the smallest one.
+        Raises: IndexError if k is not between 0 and len(self) - 1.
+        :param k:
+        :return:
+        '''
+        if not 0 <= k < self._size:
+            raise IndexError("Index out of range.")
+        if not self._keepSizes:
+            return next(islice(self._inorderNodes(), k, None)).data
+        node = self._root
+        while True:
+            leftSize = _size(node.left)
+            if k < leftSize:
+                node = node.left
+            elif k == leftSize:
+                return node.data
+            else:
+                k -= leftSize + 1
+                node = node.right
+
+    def count_range(self, low, high):
+        '''
+        Returns the number of items in the tree, where low <= item <= high.
+        :param low:
+        :param high:
+        :return: int
+        '''
+        if high < low:
+            return 0
+        return self._countUpTo(high) - self.rank(low)
+
+    def _countWhile(self, predicate):
+        '''
+        Returns the number of the smallest items in the tree for which
+        predicate holds, walking them in order.
+        '''
+        result = 0
+        for node in self._inorderNodes():
+            if not predicate(node.data):
+                break
+            result += 1
+        return result
+
     def BFT_tree(self):
         current = self._root
         cur_queue = LinkedQueue()
@@ -4,9 +4,60 @@ A tester program for binary search trees.
 """
 
 from binary_search_tree.linkedbst import LinkedBST
+from binary_search_tree.avlbst import AVLTree
+from itertools import islice
+from math import log
+import bisect
 import random
 
 
+def randomChanges(tree, steps, seed):
+    """Adds and removes random items with repeats, checking the items
+    of the tree against a sorted list after every change. Returns the
+    list."""
+    rng = random.Random(seed)
+    lyst = []
+    for step in range(steps):
+        if lyst and rng.random() < 0.4:
+            item = rng.choice(lyst)
+            tree.remove(item)
+            lyst.remove(item)
+        else:
+            item = rng.randrange(steps // 4)
+            tree.add(item)
+            bisect.insort(lyst, item)
+        if list(tree.inorder()) != lyst or len(tree) != len(lyst):
+            raise AssertionError("Items differ from {} after step {}.".format(lyst, step))
+    return lyst
+
+
+def checkOrderStatistics(tree, lyst):
+    """Checks rank, select, count_range, num_children and pages of
+    rangeIter of the tree against lyst, the sorted list of its items."""
+    for low in range(-1, lyst[-1] + 2):
+        if tree.rank(low) != bisect.bisect_left(lyst, low):
+            raise AssertionError("Wrong rank of {}.".format(low))
+        for high in (low - 1, low, low + 10):
+            expected = lyst[bisect.bisect_left(lyst, low):bisect.bisect_right(lyst, high)]
+            if tree.count_range(low, high) != len(expected):
+                raise AssertionError("Wrong count_range({}, {}).".format(low, high))
+            pages = []
+            cursor = 0
+            while True:
+                page = list(islice(tree.rangeIter(low, high, cursor), 7))
+                if not page:
+                    break
+                pages.extend(page)
+                cursor += len(page)
+            if pages != expected:
+                raise AssertionError("Wrong pages of rangeIter({}, {}).".format(low, high))
+    for k, item in enumerate(lyst):
+        if tree.select(k) != item:
+            raise AssertionError("Wrong select({}).".format(k))
+    if tree.num_children(tree._root) != len(lyst) - 1:
+        raise AssertionError("Wrong num_children of the root.")
+
+
 def main():
     tree = LinkedBST()
     print("Adding D B A C F E G")
@@ -69,6 +120,44 @@ def main():
     tree.rebalance()
     print(tree)
 
+    tree = AVLTree(range(1, 16))
+    print("\nAVLTree added 1..15:\n" + str(tree))
+    print("Expect 3: ", tree.height())
+    print("Expect True for isBalanced: ", tree.isBalanced())
+    for item in range(1, 16, 2):
+        tree.remove(item)
+    print("Removed odd items:\n" + str(tree))
+
+    randomChanges(LinkedBST(), 2000, 2)
+    print("LinkedBST passed 2000 random changes")
+
+    tree = AVLTree()
+    lyst = randomChanges(tree, 2000, 1)
+    print("AVLTree after 2000 random changes, expect True for height "
+          "within 1.45 log2(n + 2): ", tree.height() + 1 <= 1.45 * log(len(lyst) + 2, 2))
+    print("Expect True for successor and predecessor: ",
+          all(tree.successor(item) == next((x for x in lyst if x > item), None)
+              and tree.predecessor(item) == next((x for x in reversed(lyst) if x < item), None)
+              for item in range(-1, 502)))
+    print("Expect True for rangeFind(100, 200): ",
+          tree.rangeFind(100, 200) == [x for x in lyst if 100 <= x <= 200])
+
+    for treeType in (LinkedBST, AVLTree):
+        for keepSizes in (False, True):
+            tree = treeType(keepSizes=keepSizes)
+            lyst = randomChanges(tree, 1000, 3)
+            checkOrderStatistics(tree, lyst)
+            if treeType is LinkedBST:
+                tree.rebalance()
+                checkOrderStatistics(tree, lyst)
+            print("{} with keepSizes={} passed order statistics".format(
+                treeType.__name__, keepSizes))
+    try:
+        tree.rangeIter(0, 10, -1)
+        print("Expect ValueError for a negative offset, got none")
+    except ValueError:
+        print("Expect ValueError for a negative offset: ValueError")
+
 
 # print("\nAdded ", lyst, "\n" + str(tree))
 # tree.remove(10)
@@ -0,0 +1,70 @@
+"""Vectorized evaluation of many tic tac toe positions at once.
+
+Positions are given as an (M, N, N) int8 array with 1 for MARKS[0] ('x'),
+-1 for MARKS[1] ('o') and 0 for an empty cell. A player wins having k
+marks in a row, column or diagonal, a full board without a winner is a
+draw, like Board.have_winner and Board.is_draw say for a game.
+"""
+
+import numpy as np
+
+ONGOING, WIN, DRAW = 0, 1, 2
+
+
+def to_array(boards):
+    "Returns (M, N, N) int8 array of positions of the Board objects."
+    boards = list(boards)
+    size = boards[0].size if boards else 0
+    result = np.zeros((len(boards), size, size), dtype=np.int8)
+    for index, board in enumerate(boards):
+        for cell in range(size * size):
+            if board.bits[0] >> cell & 1:
+                result[index, cell // size, cell % size] = 1
+            elif board.bits[1] >> cell & 1:
+                result[index, cell // size, cell % size] = -1
+    return result
+
+
+def line_sums(boards, k):
+    """Returns sums of every k long row, column and diagonal of the
+    positions as an (M, L) array, L being the number of such lines."""
+    size = boards.shape[1]
+    span = size - k + 1
+    boards = boards.astype(np.int16)
+    rows = sum(boards[:, :, i:span + i] for i in range(k))
+    cols = sum(boards[:, i:span + i, :] for i in range(k))
+    diagonals = sum(boards[:, i:span + i, i:span + i] for i in range(k))
+    anti_diagonals = sum(boards[:, i:span + i, k - 1 - i:size - i] for i in range(k))
+    return np.concatenate([lines.reshape(len(boards), -1) for lines in
+                           (rows, cols, diagonals, anti_diagonals)], axis=1)
+
+
+def evaluate(boards, k=None, legal_moves=False, chunk=2 ** 16):
+    """Returns (status, winner) arrays of the positions: status is ONGOING,
+    WIN or DRAW, winner 1 or -1 for a won game and 0 otherwise (1 if both
+    players have a line, which can not happen in a game). With legal_moves
+    also returns (M, N, N) bool array of empty cells of the ongoing games.
+    k is the board size by default; positions are processed chunk at a
+    time to keep temporary arrays small."""
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError("Boards have to be given as (M, N, N) array.")
+    size = boards.shape[1]
+    k = size if k is None else k
+    if not 0 < k <= size:
+        raise ValueError("Row length has to be between 1 and the board size.")
+    status = np.empty(len(boards), dtype=np.int8)
+    winner = np.empty(len(boards), dtype=np.int8)
+    for start in range(0, len(boards), chunk):
+        part = boards[start:start + chunk]
+        sums = line_sums(part, k)
+        first_won = (sums == k).any(axis=1)
+        second_won = (sums == -k).any(axis=1)
+        full = (part != 0).all(axis=(1, 2))
+        winner[start:start + chunk] = np.where(first_won, 1, np.where(second_won, -1, 0))
+        status[start:start + chunk] = np.where(first_won | second_won, WIN,
+                                               np.where(full, DRAW, ONGOING))
+    if not legal_moves:
+        return status, winner
+    return status, winner, (boards == 0) & (status == ONGOING)[:, None, None]
+
@@ -0,0 +1,128 @@
+"""Benchmarks of AI_Bot.make_move on a fixed corpus of positions.
+
+Every case is timed with a fresh bot, so transposition tables start
+empty, and run once more under tracemalloc for the peak memory. Results
+are written as JSON; comparing them with an earlier run reports cases
+which became slower or use more memory:
+
+    python -m tic_tac_toe.benchmark --output new.json --compare baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+from tic_tac_toe.board import Board, AI_Bot, MARKS, parse_move, format_move
+
+# Name, board size, k, moves made so far (players alternate, 'x' first)
+# and keyword arguments of AI_Bot.
+CORPUS = (
+    ('3x3 empty', 3, 3, (), {}),
+    ('3x3 after 1 ply', 3, 3, ('B2',), {}),
+    ('3x3 after 2 plies', 3, 3, ('B2', 'A1'), {}),
+    ('3x3 after 4 plies', 3, 3, ('B2', 'A1', 'C3', 'C1'), {}),
+    ('3x3 near terminal', 3, 3, ('B2', 'A1', 'C3', 'C1', 'B1', 'B3', 'A2'), {}),
+    ('3x3 empty sum mode', 3, 3, (), {'mode': 'sum'}),
+    ('3x3 after 1 ply sum mode', 3, 3, ('B2',), {'mode': 'sum'}),
+    ('4x4 empty', 4, 4, (), {}),
+    ('4x4 after 2 plies', 4, 4, ('B2', 'C3'), {}),
+    ('7x7 k5 after 2 plies', 7, 5, ('D4', 'C3'), {'node_limit': 20000}),
+    ('15x15 k5 after 2 plies', 15, 5, ('H8', 'G7'), {'node_limit': 5000}),
+)
+
+
+def make_board(size, k, moves):
+    "Returns board after the moves."
+    board = Board(size, k)
+    for number, move in enumerate(moves):
+        board.make_move(parse_move(move, size), MARKS[number % 2])
+        if board.have_winner() or board.is_draw():
+            raise ValueError("Benchmark position has to be unfinished.")
+    return board
+
+
+def run_case(size, k, moves, options, repeat=3):
+    """Returns results of a case: the move, the best time of repeat runs,
+    searched nodes, nodes per second and peak traced memory in KiB."""
+    if repeat < 1:
+        raise ValueError("Cases have to be run at least once.")
+    times = []
+    for run in range(repeat + 1):
+        board = make_board(size, k, moves)
+        with AI_Bot('benchmark', **options) as bot:
+            bot.set_mark(MARKS[len(moves) % 2])
+            if run == repeat:
+                tracemalloc.start()
+                bot.make_move(board)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                start = perf_counter()
+                move = bot.make_move(board)
+                times.append(perf_counter() - start)
+    seconds = min(times)
+    return {'move': format_move(move), 'seconds': seconds, 'nodes': bot.nodes,
+            'nodes_per_second': bot.nodes / seconds if seconds else None,
+            'peak_kib': peak / 1024}
+
+
+def run(corpus=CORPUS, repeat=3, names=None):
+    "Runs the cases of corpus (with given names only) and returns results."
+    results = {}
+    for name, size, k, moves, options in corpus:
+        if names is None or name in names:
+            results[name] = run_case(size, k, moves, options, repeat)
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'results': results}
+
+
+def compare(old, new, tolerance=0.1):
+    """Returns list of messages about cases of new run which take more time
+    or memory than in old run by more than tolerance (a fraction), or
+    choose another move."""
+    messages = []
+    for name, result in new['results'].items():
+        if name not in old['results']:
+            continue
+        before = old['results'][name]
+        for key, label in (('seconds', 'time'), ('peak_kib', 'peak memory')):
+            if result[key] > before[key] * (1 + tolerance):
+                messages.append("{}: {} {:.4g} -> {:.4g} (+{:.0%})".format(
+                    name, label, before[key], result[key], result[key] / before[key] - 1))
+        if result['move'] != before['move']:
+            messages.append("{}: move {} -> {}".format(name, before['move'], result['move']))
+    return messages
+
+
+def main():
+    "Runs the benchmarks, writes and compares the results as asked by arguments."
+    parser = argparse.ArgumentParser(description="Benchmark AI_Bot.make_move.")
+    parser.add_argument('--output', help="file to write JSON results to")
+    parser.add_argument('--compare', help="JSON results of an earlier run")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument('--case', action='append', help="run only cases with this name")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat has to be at least 1")
+    results = run(repeat=args.repeat, names=args.case)
+    for name, result in results['results'].items():
+        print("{:28} {:>4} {:10.2f} ms {:10} nodes {:12.0f} nodes/s {:10.1f} KiB".format(
+            name, result['move'], 1000 * result['seconds'], result['nodes'],
+            result['nodes_per_second'] or 0, result['peak_kib']))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            messages = compare(json.load(file), results, args.tolerance)
+        for message in messages:
+            print("REGRESSION " + message)
+        if messages:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,353 @@
-from copy import deepcopy
-from tic_tac_toe.tree import Node, Tree
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from random import Random
+from time import perf_counter
+from tic_tac_toe.engine import SearchEngine
+from tic_tac_toe.stats import SearchStats
+from tic_tac_toe.tree import SearchTree
+from tic_tac_toe.transposition import TranspositionTable
+
+
+MARKS = ('x', 'o')
+
+
+class Geometry:
+    """Tables shared by all boards of one size and winning row length:
+    winning lines, lines through every cell, symmetries and Zobrist keys.
+    Use Geometry.get to get the cached instance."""
+
+    _cache = {}
+
+    @classmethod
+    def get(cls, size, k):
+        "Returns geometry of size x size board with k in a row to win."
+        if (size, k) not in cls._cache:
+            cls._cache[size, k] = cls(size, k)
+        return cls._cache[size, k]
+
+    def __init__(self, size, k):
+        if not 0 < k <= size:
+            raise ValueError("Row length has to be between 1 and the board size.")
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.moves = tuple((cell // size, cell % size) for cell in range(self.cells))
+        self.lines = self._lines()
+        # Indices of the winning lines going through every cell, so only
+        # they are checked and counted after a move.
+        self.lines_through = tuple(
+            tuple(index for index, line in enumerate(self.lines) if cell in line)
+            for cell in range(self.cells))
+        # Cells on most winning lines come first: center, corners, edges on 3x3;
+        # of those on equally many lines the ones closer to the center.
+        last = size - 1
+        self.move_order = tuple(sorted(
+            range(self.cells),
+            key=lambda cell: (-len(self.lines_through[cell]),
+                              (2 * (cell // size) - last) ** 2 + (2 * (cell % size) - last) ** 2)))
+        # symmetries[t][cell] is the cell that cell is mapped to by symmetry t.
+        self.symmetries = self._symmetries()
+
+        # Random 64-bit Zobrist keys for every mark on every cell, for the
+        # side to move and for the search depth, which is a part of the
+        # position key of the summing AI search.
+        rand = Random(2019 + 1000 * size + k)
+        self.zobrist = tuple(tuple(rand.getrandbits(64) for cell in range(self.cells))
+                             for mark in MARKS)
+        self.zobrist_depth = tuple(rand.getrandbits(64) for depth in range(self.cells + 2))
+        self.zobrist_turn = tuple(rand.getrandbits(64) for mark in MARKS)
+        # Keys of a mark on a cell as seen in every symmetric image of the board.
+        self.zobrist_sym = tuple(
+            tuple(tuple(keys[perm[cell]] for perm in self.symmetries)
+                  for cell in range(self.cells)) for keys in self.zobrist)
+
+    def _lines(self):
+        "Returns tuples of cells of every k long row, column and diagonal."
+        size, k = self.size, self.k
+        lines = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row = row + d_row * (k - 1)
+                    end_col = col + d_col * (k - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        lines.append(tuple((row + d_row * i) * size + col + d_col * i
+                                           for i in range(k)))
+        return tuple(lines)
+
+    def _symmetries(self):
+        "Returns cell permutations of the 4 rotations and 4 reflections of the board."
+        last = self.size - 1
+        transforms = (lambda r, c: (r, c), lambda r, c: (c, last - r),
+                      lambda r, c: (last - r, last - c), lambda r, c: (last - c, r),
+                      lambda r, c: (r, last - c), lambda r, c: (last - r, c),
+                      lambda r, c: (c, r), lambda r, c: (last - c, last - r))
+        perms = []
+        for transform in transforms:
+            perms.append(tuple(row * self.size + col for row, col in
+                               (transform(*move) for move in self.moves)))
+        return tuple(perms)
 
 
 class Board:
-    "Represent board in tic tac toe game"
+    """Represent board in tic tac toe game: size x size cells, k marks in a
+    row, column or diagonal win (k is size by default)."""
 
-    def __init__(self):
-        self.board = [[None for i in range(3)] for i in range(3)]
+    def __init__(self, size=3, k=None):
+        self.geometry = Geometry.get(size, size if k is None else k)
+        self.size = size
+        self.k = self.geometry.k
+        # Occupancy bit masks, one per mark in MARKS order; bit row * size + col.
+        self.bits = [0, 0]
+        # Number of marks of every kind on every winning line.
+        self.counts = [[0] * len(self.geometry.lines) for mark in MARKS]
         self.last_move = None
         self.last_sign = None
+        # Moves in the order they were made, used to undo them.
+        self.history = []
+        # Zobrist hashes of the position in every symmetric image,
+        # hashes[0] is the board as it is; updated with every move.
+        self.hashes = [0] * len(self.geometry.symmetries)
 
-    def have_winner(self):
-        "Checks if winner appeared."
-        if self.last_move is None: return False
-        row = self.last_move[0]
-        col = self.last_move[1]
+    @property
+    def board(self):
+        "Returns board as list of rows with marks or None."
+        moves = self.geometry.moves
+        return [[self.get_mark(move) for move in moves[row * self.size:(row + 1) * self.size]]
+                for row in range(self.size)]
 
-        if self.board[row][0] == self.board[row][1] == self.board[row][2] == self.last_sign:
-            return True
+    @property
+    def hash(self):
+        "Returns Zobrist hash of the position."
+        return self.hashes[0]
 
-        if self.board[0][col] == self.board[1][col] == self.board[2][col] == self.last_sign:
-            return True
+    def canonical(self):
+        """Returns (key, symmetry): the least Zobrist hash among symmetric
+        images of the position, which is the same for all of them, and the
+        symmetry mapping the board to that image."""
+        key = min(self.hashes)
+        return key, self.hashes.index(key)
 
-        first_diagonal = row == col
-        second_diagonal = row + col == 2
+    def canonical_hash(self):
+        "Returns hash shared by all symmetric images of the position."
+        return min(self.hashes)
 
-        if first_diagonal:
-            if self.board[0][0] == self.board[1][1] == self.board[2][2] == self.last_sign:
-                return True
+    def transform_move(self, move, symmetry):
+        "Returns move mapped by the symmetry."
+        cell = self.geometry.symmetries[symmetry][move[0] * self.size + move[1]]
+        return self.geometry.moves[cell]
 
-        if second_diagonal:
-            if self.board[0][2] == self.board[1][1] == self.board[2][0] == self.last_sign:
-                return True
+    def inverse_move(self, move, symmetry):
+        "Returns move which the symmetry maps to the given one."
+        cell = self.geometry.symmetries[symmetry].index(move[0] * self.size + move[1])
+        return self.geometry.moves[cell]
+
+    def unique_moves(self):
+        """Returns available moves leaving out those equivalent to an earlier
+        one under a symmetry of the current position."""
+        stabilizer = [perm for perm, key in zip(self.geometry.symmetries, self.hashes)
+                      if key == self.hashes[0] and self._maps_to_self(perm)]
+        moves = []
+        for move in self.available_moves():
+            cell = move[0] * self.size + move[1]
+            if all(perm[cell] >= cell for perm in stabilizer):
+                moves.append(move)
+        return moves
+
+    def _maps_to_self(self, perm):
+        "Checks that the cell permutation leaves the position unchanged."
+        for bits in self.bits:
+            for cell in range(self.geometry.cells):
+                if bits >> cell & 1 and not bits >> perm[cell] & 1:
+                    return False
+        return True
+
+    def encode(self):
+        """Returns compact form of the position: size, k, bit masks of both
+        marks and the cell of the last move or -1."""
+        last = -1 if self.last_move is None else self.last_move[0] * self.size + self.last_move[1]
+        return self.size, self.k, self.bits[0], self.bits[1], last
+
+    @classmethod
+    def decode(cls, code):
+        "Returns board made from the encoded position."
+        size, k, *bits, last = code
+        board = cls(size, k)
+        for index, mark in enumerate(MARKS):
+            for cell, move in enumerate(board.geometry.moves):
+                if bits[index] >> cell & 1 and cell != last:
+                    board.make_move(move, mark)
+        if last >= 0:
+            board.make_move(board.geometry.moves[last], MARKS[0 if bits[0] >> last & 1 else 1])
+        return board
+
+    def get_mark(self, move):
+        "Returns mark placed on the cell or None."
+        bit = 1 << (move[0] * self.size + move[1])
+        for index, bits in enumerate(self.bits):
+            if bits & bit:
+                return MARKS[index]
+        return None
 
+    def have_winner(self):
+        "Checks if winner appeared."
+        if self.last_move is None: return False
+        counts = self.counts[MARKS.index(self.last_sign)]
+        for line in self.geometry.lines_through[self.last_move[0] * self.size + self.last_move[1]]:
+            if counts[line] == self.k:
+                return True
         return False
 
     def is_draw(self):
         "Checks if game is played in draw."
-        if not self.available_moves() and not self.have_winner():
+        if self.bits[0] | self.bits[1] == self.geometry.full and not self.have_winner():
             return True
         return False
 
     def make_move(self, move, mark):
         "Make move."
-        self.board[move[0]][move[1]] = mark
+        cell = move[0] * self.size + move[1]
+        bit = 1 << cell
+        index = MARKS.index(mark)
+        if self.bits[1 - index] & bit:
+            self.bits[1 - index] &= ~bit
+            self._update(1 - index, cell, -1)
+        if not self.bits[index] & bit:
+            self.bits[index] |= bit
+            self._update(index, cell, 1)
         self.last_move = move
         self.last_sign = mark
+        self.history.append(move)
+
+    def undo_move(self):
+        "Takes back the last move and restores last_move and last_sign."
+        move = self.history.pop()
+        cell = move[0] * self.size + move[1]
+        bit = 1 << cell
+        for index, bits in enumerate(self.bits):
+            if bits & bit:
+                self.bits[index] = bits & ~bit
+                self._update(index, cell, -1)
+        if self.history:
+            self.last_move = self.history[-1]
+            self.last_sign = self.get_mark(self.last_move)
+        else:
+            self.last_move = None
+            self.last_sign = None
+
+    def _update(self, index, cell, delta):
+        """Adds (delta 1) or removes (delta -1) mark with index on the cell
+        in line counts and hashes."""
+        counts = self.counts[index]
+        for line in self.geometry.lines_through[cell]:
+            counts[line] += delta
+        hashes = self.hashes
+        for symmetry, key in enumerate(self.geometry.zobrist_sym[index][cell]):
+            hashes[symmetry] ^= key
 
     def available_moves(self):
         "Returns list of the available moves"
-        avail_list = []
-        for key1, row in enumerate(self.board):
-            for key2, elem in enumerate(row):
-                if elem is None:
-                    avail_list.append(tuple((key1, key2)))
-        return avail_list
+        empty = ~(self.bits[0] | self.bits[1])
+        return [move for cell, move in enumerate(self.geometry.moves) if empty >> cell & 1]
+
+    def ordered_moves(self):
+        "Returns available moves, those on most winning lines first."
+        empty = ~(self.bits[0] | self.bits[1])
+        moves = self.geometry.moves
+        return [moves[cell] for cell in self.geometry.move_order if empty >> cell & 1]
+
+    def count_empty(self):
+        "Returns number of empty cells."
+        return self.geometry.cells - bin(self.bits[0] | self.bits[1]).count('1')
 
     def show(self):
         "Prints out board."
+        width = len(str(self.size))
         print("\t\tBoard: \n")
-        print("  A B C")
+        print(" " * width, " ".join(chr(ord('A') + col) for col in range(self.size)))
 
         for key1, row in enumerate(self.board):
-            print(str(key1+1),end=' ')
+            print(str(key1+1).rjust(width),end=' ')
             for key2, elem in enumerate(row):
-                char = self.board[key1][key2]
+                char = row[key2]
                 print(char if char is not None else " ", end=' ')
             print()
 
 
+class BoardState:
+    """Board as a game state of tic_tac_toe.engine, with the player having
+    mark to move. Positions equal up to a symmetry of the board share keys,
+    moves stored for them are mapped by the symmetry. Unfinished positions
+    are scored by evaluate(board, mark), line_evaluation by default."""
+
+    def __init__(self, board, mark, evaluate=None):
+        self.board = board
+        self.mark = mark
+        self.evaluate_board = evaluate if evaluate is not None else line_evaluation
+        # Symmetry of the last key() of the position by number of moves made.
+        self._symmetries = [0] * (board.geometry.cells + 1)
+
+    def moves(self):
+        "Returns available moves, the center and corners first."
+        return self.board.ordered_moves()
+
+    def apply(self, move):
+        "Makes the move for the player to move."
+        self.board.make_move(move, self.mark)
+        self.mark = other_mark(self.mark)
+
+    def undo(self):
+        "Takes back the last move."
+        self.board.undo_move()
+        self.mark = other_mark(self.mark)
+
+    def won(self):
+        "Checks if the last move won the game."
+        return self.board.have_winner()
+
+    def is_draw(self):
+        "Checks if game is played in draw."
+        return self.board.is_draw()
+
+    def remaining(self):
+        "Returns number of empty cells."
+        return self.board.count_empty()
+
+    def key(self):
+        "Returns hash shared by the symmetric images of the position and the player to move."
+        key, self._symmetries[len(self.board.history)] = self.board.canonical()
+        return key ^ self.board.geometry.zobrist_turn[MARKS.index(self.mark)]
+
+    def canonical_move(self, move):
+        "Returns the move mapped to the image of the position key() stands for."
+        return self.board.transform_move(move, self._symmetries[len(self.board.history)])
+
+    def actual_move(self, move):
+        "Returns the move of the image of the position key() stands for mapped back."
+        return self.board.inverse_move(move, self._symmetries[len(self.board.history)])
+
+    def evaluate(self):
+        "Returns value of the position for the player to move."
+        return self.evaluate_board(self.board, self.mark)
+
+
+def line_evaluation(board, mark):
+    """Static evaluation of the position for the player with mark to move.
+    Every winning line holding marks of one player only counts 4 to the
+    power of their number for that player; the sum is scaled to lie between
+    -AI_Bot.WIN_SCORE and AI_Bot.WIN_SCORE."""
+    index = MARKS.index(mark)
+    total = 0
+    for mine, theirs in zip(board.counts[index], board.counts[1 - index]):
+        if not theirs:
+            if mine:
+                total += 4 ** mine
+        elif not mine:
+            total -= 4 ** theirs
+    return (AI_Bot.WIN_SCORE - 1) * total / (len(board.geometry.lines) * 4 ** board.k)
+
+
 class Player:
     "Represent a tic tac toe player"
 
@@ -82,16 +361,21 @@ class Player:
         "Set players mark."
         self.mark = char
 
+    def close(self):
+        "Releases processes and threads of the player, if it has any."
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def make_move(self, board):
         "Makes move."
         try:
-            move = input(("Please, {}, enter your move, like this 'A1': ").format(self.name))
-            if len(move) != 2: raise ValueError("2 characters should be entered")
-            if not move[0].isalpha(): raise ValueError("First character has to be letter.")
-            if not move[1].isdigit(): raise ValueError("Second character has to be digit.")
-            letter_A_ascii_code = 65
-            move = tuple(((int(move[1]) - 1), ord(move[0].upper()) - letter_A_ascii_code))
-            if not (0 <= move[0] < 3 and 0 <= move[1] < 3): raise ValueError("Move you've entered is out of the range.")
+            move = parse_move(input(("Please, {}, enter your move, like this 'A1': ").format(self.name)),
+                              board.size)
             if not move in board.available_moves(): raise ValueError("This move has been done earlier.")
             return move
         except ValueError as e:
@@ -99,49 +383,298 @@ class Player:
             return self.make_move(board)
 
 
+class RandomBot(Player):
+    "Tic tac toe player making random moves."
+
+    def __init__(self, *args, seed=None):
+        Player.__init__(self, *args)
+        self.random = Random(seed)
+
+    def make_move(self, board):
+        "Returns random available move."
+        return self.random.choice(board.available_moves())
+
+
 class AI_Bot(Player):
+    """Tic tac toe player searching the whole game tree.
+
+    Mode 'negamax' finds the best move by the negamax search with alpha-beta
+    pruning of tic_tac_toe.engine, trying the center and corners first and
+    stopping as soon as the quickest possible win is found. Mode 'sum' is the original
+    heuristic choosing the move with the biggest sum of depth weighted
+    scores of all games following it. Mode 'solved' looks the values of
+    the moves up in solution, a PositionTable made by tic_tac_toe.solver
+    or a path to its file.
+
+    With time_limit (seconds) or node_limit the negamax search deepens
+    iteratively, scoring positions at the depth limit with evaluate
+    (line_evaluation by default), and returns the best move of the last
+    depth completed within the budget. The depth is left in self.depth.
+    Every make_move leaves the number of positions it searched in this
+    process in self.nodes.
+
+    Scores of searched positions are kept in a transposition table for the
+    whole game, pass table to share one between games or to tune its size
+    and replacement policy. Positions equal up to a rotation or reflection
+    share an entry, and of root moves equivalent under a symmetry of the
+    board only the first one is searched.
+
+    The search keeps no game tree. To look into it set capture_depth, then
+    every make_move leaves the searched tree down to that depth in
+    self.tree.
+
+    With workers set, moves from the current position are searched in
+    parallel by that many processes, call close or use the bot in a with
+    statement to stop them.
+
+    With stats set every make_move leaves a SearchStats of its search in
+    self.stats and, if stats is callable, passes it to stats as well, e.g.
+    to log it. Without it the search counts nodes only and runs at full
+    speed.
+
+    With ponder set the bot goes on searching in a background thread after
+    its move, trying the replies of the opponent in the order of
+    ordered_moves, and answers a reply it got to at once. Call close to
+    stop the thread.
+    """
+
+    MODES = ('negamax', 'sum', 'solved')
+    # Score of a won game, increased by the number of cells left empty.
+    WIN_SCORE = 100
+
+    def __init__(self, *args, table=None, mode='negamax', capture_depth=None,
+                 time_limit=None, node_limit=None, evaluate=None, solution=None,
+                 workers=None, stats=None, ponder=False):
+        if mode not in self.MODES:
+            raise ValueError("Unknown search mode: {}.".format(mode))
+        if (mode == 'solved') != (solution is not None):
+            raise ValueError("Solution has to be given for the 'solved' mode only.")
+        if mode == 'sum' and (time_limit is not None or node_limit is not None):
+            raise ValueError("Search limits need the 'negamax' mode.")
+        if workers is not None and (time_limit is not None or node_limit is not None
+                                    or capture_depth is not None or mode == 'solved'):
+            raise ValueError("Parallel search works without limits and tree capture only.")
+        if workers is not None and stats:
+            raise ValueError("Statistics are not collected by the parallel search.")
+        if ponder and (mode != 'negamax' or workers is not None or capture_depth is not None):
+            raise ValueError("Pondering needs the 'negamax' mode without workers and tree capture.")
+        Player.__init__(self, *args)
+        self.table = table if table is not None else TranspositionTable()
+        self.mode = mode
+        self.capture_depth = capture_depth
+        self.tree = None
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.evaluate = evaluate if evaluate is not None else line_evaluation
+        if isinstance(solution, str):
+            from tic_tac_toe.solver import PositionTable
+            solution = PositionTable(solution)
+        self.solution = solution
+        self.engine = SearchEngine(self.table, time_limit, node_limit, self.WIN_SCORE)
+        self.depth = None
+        self.nodes = 0
+        self.workers = workers
+        self._executor = None
+        self.collect_stats = stats
+        self.stats = None
+        # Statistics of the current search if collected.
+        self._stats = None
+        self.ponder = ponder
+        self._ponderer = None
+
+    def close(self):
+        "Stops worker processes of the parallel search and pondering."
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._ponderer is not None:
+            self._ponderer.stop()
+
     def make_move(self, board):
+        "Returns best move for the board."
+        if self.ponder:
+            return self._pondered_move(board)
+        if self.collect_stats:
+            return self._instrumented_move(board)
+        return self._best_move(board)
 
-        def rec_tree(board, node, depth=1):
-            if board.have_winner():
-                if board.last_sign == self.mark:
-                    node.score = 100 / depth
-                    return node.score
-                else:
-                    node.score = -100 / depth
-                    return node.score
-            if board.is_draw():
-                node.score = 30 / depth
-                return node.score
-            for i in board.available_moves():
-                temp_node = Node(i)
-                node.children.append(temp_node)
-            for i in node.children:
-                temp_board = deepcopy(board)
-                temp_board.make_move(i.data, mark=(self.mark if (depth % 2 == 0) else other_mark(self.mark)))
-                rec_tree(temp_board, i, depth=depth + 1)
-                node.score += i.score
-
-            """
-            board.show()
-            print('t'*depth+str(node.score))
-            return node.score
-            """
-
-        res_list = []
-
-        for i in board.available_moves():
-            temp_node = Node(i)
-            temp_tree = Tree(temp_node)
-            temp_board = deepcopy(board)
-            temp_board.make_move(i, self.mark)
-            rec_tree(temp_board, temp_node)
-            res_list.append((temp_tree._root.data, temp_tree._root.score))
-
-        """print(*res_list)"""
-        return max(res_list, key=lambda x: x[1])[0]
+    def _pondered_move(self, board):
+        """Returns best move for the board, found by pondering if it got to
+        the board, and starts pondering on the position after the move."""
+        if self._ponderer is None:
+            from tic_tac_toe.ponder import Ponderer
+            self._ponderer = Ponderer(self)
+        self._ponderer.stop()
+        found = self._ponderer.lookup(board)
+        if found is not None:
+            move, self.depth = found
+            self.nodes = 0
+            if self.collect_stats:
+                stats = SearchStats()
+                stats.move = move
+                stats.pondered = True
+                self._report(stats)
+        elif self.collect_stats:
+            move = self._instrumented_move(board)
+        else:
+            move = self._best_move(board)
+        self._ponderer.start(board, move)
+        return move
+
+    def _best_move(self, board):
+        "Returns best move for the board, searching as set by the mode."
+        self.nodes = 0
+        if self.mode == 'solved':
+            return self.solution.best_move(board, self.mark)
+        if self.workers is not None:
+            return self._parallel_move(board)
+        if self.mode == 'sum':
+            if self.capture_depth is not None:
+                self.tree = SearchTree(self.capture_depth, board.size)
+            return self._sum_move(board)
+        unique = board.unique_moves()
+        moves = [move for move in board.ordered_moves() if move in unique]
+        engine = self.engine
+        engine.stats = self._stats
+        if self.capture_depth is not None:
+            engine.tree_factory = lambda: SearchTree(self.capture_depth, board.size)
+        try:
+            move = engine.best_move(BoardState(board, self.mark, self.evaluate), moves)
+        finally:
+            engine.stats = engine.tree_factory = None
+        self.depth, self.nodes = engine.depth, engine.nodes
+        if self.capture_depth is not None:
+            self.tree = engine.tree
+            if self.tree is not None:
+                self.tree.scores[0] = engine.value
+        return move
+
+    def _instrumented_move(self, board):
+        """Returns best move for the board, collecting statistics of its
+        search in self.stats."""
+        stats = self._stats = SearchStats()
+        hits, misses = self.table.hits, self.table.misses
+        start = perf_counter()
+        try:
+            stats.move = self._best_move(board)
+        finally:
+            stats.seconds = perf_counter() - start
+            self._stats = None
+        stats.nodes = self.nodes
+        stats.hits = self.table.hits - hits
+        stats.misses = self.table.misses - misses
+        self._report(stats)
+        return stats.move
+
+    def _report(self, stats):
+        "Leaves statistics of the move in self.stats and passes them to the callback."
+        self.stats = stats
+        if callable(self.collect_stats):
+            self.collect_stats(stats)
+
+    def _parallel_move(self, board):
+        """Returns best move, searching every move from the position in a
+        worker process. Results are taken in the order of the moves, so the
+        choice is the same as of the search in one process."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        moves = board.unique_moves()
+        if self.mode == 'negamax':
+            moves = [move for move in board.ordered_moves() if move in moves]
+            self.depth = board.count_empty()
+        values = self._executor.map(_root_move_value, repeat(board.encode()), moves,
+                                    repeat(self.mark), repeat(self.mode))
+        best_move, best = None, None
+        for move, value in zip(moves, values):
+            if best is None or value > best:
+                best_move, best = move, value
+        return best_move
+
+    def _sum_move(self, board):
+        "Returns move with the biggest sum of scores of games following it."
+        best_move, best = None, None
+        for move in board.unique_moves():
+            score = self._sum_score(board, move, self.mark, 1)
+            if best is None or score > best:
+                best_move, best = move, score
+        if self.tree is not None:
+            self.tree.scores[0] = best
+        return best_move
+
+    def _sum_score(self, board, move, mark, depth):
+        """Returns sum of scores of all games following the move made by the
+        player with mark: 100 for a win, -100 for a loss and 30 for a draw,
+        each divided by the depth of the game's end."""
+        self.nodes += 1
+        tree = self.tree
+        if tree is not None:
+            tree.enter(move)
+        board.make_move(move, mark)
+        stats = self._stats
+        if stats is not None:
+            stats.max_depth = max(stats.max_depth, depth)
+            start = perf_counter()
+        won = board.have_winner()
+        drawn = not won and board.is_draw()
+        if stats is not None:
+            stats.win_detection_seconds += perf_counter() - start
+            stats.terminals += won or drawn
+        if won:
+            score = (100 if mark == self.mark else -100) / depth
+        elif drawn:
+            score = 30 / depth
+        else:
+            key = board.canonical_hash() ^ board.geometry.zobrist_depth[depth]
+            score = self.table.get(key)
+            if score is None:
+                score = 0
+                opponent = other_mark(mark)
+                if stats is not None:
+                    start = perf_counter()
+                replies = board.available_moves()
+                if stats is not None:
+                    stats.move_generation_seconds += perf_counter() - start
+                for reply in replies:
+                    score += self._sum_score(board, reply, opponent, depth + 1)
+                self.table.put(key, score, board.geometry.cells - depth)
+        board.undo_move()
+        if tree is not None:
+            tree.leave(score)
+        return score
+
+
+# Bots of worker processes of the parallel search by mode and mark, kept so
+# their transposition tables serve all moves sent to the process.
+_worker_bots = {}
+
+
+def _root_move_value(code, move, mark, mode):
+    "Returns value of the move from the encoded position, run by workers."
+    board = Board.decode(code)
+    if (mode, mark) not in _worker_bots:
+        _worker_bots[mode, mark] = AI_Bot('worker', mode=mode)
+        _worker_bots[mode, mark].set_mark(mark)
+    bot = _worker_bots[mode, mark]
+    if mode == 'sum':
+        return bot._sum_score(board, move, mark, 1)
+    return bot.engine.move_value(BoardState(board, mark, bot.evaluate), move)
 
 
 def other_mark(mark):
     "Change the mark"
     return 'o' if mark == 'x' else 'x'
+
+
+def parse_move(text, size):
+    "Returns (row, col) of move written like 'A1', raises ValueError."
+    if len(text) < 2 or not text[0].isalpha() or not text[1:].isdigit():
+        raise ValueError("Move has to be a letter followed by a number.")
+    move = (int(text[1:]) - 1, ord(text[0].upper()) - ord('A'))
+    if not (0 <= move[0] < size and 0 <= move[1] < size):
+        raise ValueError("Move is out of the range.")
+    return move
+
+
+def format_move(move):
+    "Returns move written like 'A1'."
+    return "{}{}".format(chr(ord('A') + move[1]), move[0] + 1)
@@ -0,0 +1,148 @@
+"""Connect Four on bit masks, a game state of tic_tac_toe.engine.
+
+Column col of the width x height grid takes bits col * (height + 1) to
+col * (height + 1) + height - 1, from the bottom up; the bit above every
+column stays empty so that lines do not wrap from one column to the next.
+A move is the number of a column, counted from 0.
+
+    game = ConnectFour.from_moves('4453')
+    move = SearchEngine(time_limit=1).best_move(game)
+"""
+
+from tic_tac_toe.engine import SearchEngine
+
+MARKS = ('x', 'o')
+
+
+class ConnectFour:
+    "Connect Four position: four in a row, column or diagonal win."
+
+    def __init__(self, width=7, height=6):
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        # Stones of the player to move and of both players.
+        self.current = 0
+        self.mask = 0
+        self.played = 0
+        # (current, mask) before every move, to undo it.
+        self.history = []
+        column = height + 1
+        self._bottom = [1 << (col * column) for col in range(width)]
+        self._top = [1 << (height - 1 + col * column) for col in range(width)]
+        self._full = sum(self._bottom) * ((1 << height) - 1)
+        self._shifts = (1, column, column - 1, column + 1)
+        # Center columns first.
+        self._order = sorted(range(width), key=lambda col: abs(2 * col - width + 1))
+
+    @classmethod
+    def from_moves(cls, moves, width=7, height=6):
+        "Returns position after moves given as a string of column numbers from 1."
+        game = cls(width, height)
+        for char in moves:
+            col = int(char) - 1
+            if not 0 <= col < width or not game.can_play(col):
+                raise ValueError("Move {} can not be made.".format(char))
+            game.apply(col)
+        return game
+
+    def can_play(self, col):
+        "Checks if the column has room for one more stone."
+        return not self.mask & self._top[col]
+
+    def moves(self):
+        "Returns columns which have room, the center ones first."
+        return [col for col in self._order if not self.mask & self._top[col]]
+
+    def apply(self, col):
+        "Drops stone of the player to move into the column."
+        self.history.append((self.current, self.mask))
+        self.current ^= self.mask
+        self.mask |= self.mask + self._bottom[col]
+        self.played += 1
+
+    def undo(self):
+        "Takes back the last move."
+        self.current, self.mask = self.history.pop()
+        self.played -= 1
+
+    def won(self):
+        "Checks if the last move made four in a row."
+        stones = self.current ^ self.mask
+        for shift in self._shifts:
+            pairs = stones & (stones >> shift)
+            if pairs & (pairs >> 2 * shift):
+                return True
+        return False
+
+    def is_draw(self):
+        "Checks if the grid is full without four in a row."
+        return self.played == self.cells and not self.won()
+
+    def remaining(self):
+        "Returns number of empty cells."
+        return self.cells - self.played
+
+    def key(self):
+        "Returns number unique for the position and the player to move."
+        return self.current + self.mask
+
+    def canonical_move(self, col):
+        "Returns the column: positions do not share keys with their mirror images."
+        return col
+
+    def actual_move(self, col):
+        "Returns the column, see canonical_move."
+        return col
+
+    def evaluate(self):
+        """Returns difference of numbers of empty cells completing four in a
+        row for the player to move and for the other one."""
+        return (_count(self._winning_cells(self.current))
+                - _count(self._winning_cells(self.current ^ self.mask)))
+
+    def _winning_cells(self, stones):
+        "Returns mask of empty cells which would complete four of the stones."
+        cells = (stones << 1) & (stones << 2) & (stones << 3)
+        for shift in self._shifts[1:]:
+            pair = (stones << shift) & (stones << 2 * shift)
+            cells |= pair & (stones << 3 * shift)
+            cells |= pair & (stones >> shift)
+            pair = (stones >> shift) & (stones >> 2 * shift)
+            cells |= pair & (stones << shift)
+            cells |= pair & (stones >> 3 * shift)
+        return cells & (self._full ^ self.mask)
+
+    def get_mark(self, row, col):
+        "Returns mark on the cell (row 0 is the bottom one) or None."
+        bit = 1 << (col * (self.height + 1) + row)
+        if not self.mask & bit:
+            return None
+        # The player to move made the first move if an even number was made.
+        first = self.current if self.played % 2 == 0 else self.current ^ self.mask
+        return MARKS[0] if first & bit else MARKS[1]
+
+    def show(self):
+        "Prints the grid, the top row first."
+        for row in reversed(range(self.height)):
+            print(" ".join(self.get_mark(row, col) or "." for col in range(self.width)))
+        print(" ".join(str(col + 1) for col in range(self.width)))
+
+
+def _count(bits):
+    "Returns number of set bits."
+    return bin(bits).count('1')
+
+
+def main():
+    "Plays a game of two engines with a second per move."
+    game = ConnectFour()
+    engine = SearchEngine(time_limit=1)
+    while not (game.played and (game.won() or game.is_draw())):
+        game.apply(engine.best_move(game))
+        game.show()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Negamax search with alpha-beta pruning for any two player game whose
+state provides:
+
+    moves()              list of legal moves, the likely best ones first
+    apply(move)          makes the move for the player to move
+    undo()               takes back the last applied move
+    won()                whether the last move won the game
+    is_draw()            whether the game ended without a winner
+    remaining()          number of moves which can still be made at most
+    key()                hash of the position together with the player to
+                         move; positions equal up to a symmetry may share it
+    canonical_move(move) the move as made in the position key() was computed
+                         for, if the key is shared by symmetric positions
+    actual_move(move)    inverse of canonical_move; both are called on the
+                         position of the last key() call made for it
+    evaluate()           static value of an unfinished position for the
+                         player to move, smaller than the win score in
+                         absolute value
+
+tic_tac_toe.board.BoardState and tic_tac_toe.connect_four.ConnectFour are
+such states.
+"""
+
+from time import perf_counter
+from tic_tac_toe.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+
+class _OutOfBudget(Exception):
+    "Raised inside the search when its time or node budget is spent."
+    pass
+
+
+class SearchEngine:
+    """Finds best moves of game states by negamax search with alpha-beta
+    pruning, ordering moves by the best one found before.
+
+    Without limits the game is searched to the end. With time_limit
+    (seconds) or node_limit the search deepens iteratively, scoring
+    positions at the depth limit by evaluate, and returns the best move of
+    the last depth completed within the budget; the depth is left in
+    self.depth, its value in self.value and the number of searched
+    positions in self.nodes. stop, called from another thread, ends the
+    search soon. Values of searched positions are kept in table, which may
+    be shared by states of one game only.
+
+    A won game is worth win_score increased by the number of moves left.
+    If self.stats is a SearchStats, the search counts into it. If
+    self.tree_factory is set, it is called for a tree with enter(move) and
+    leave(value) methods recording every root search; the tree of the last
+    completed one is left in self.tree.
+    """
+
+    WIN_SCORE = 10 ** 6
+
+    def __init__(self, table=None, time_limit=None, node_limit=None, win_score=None):
+        self.table = table if table is not None else TranspositionTable()
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.win_score = win_score if win_score is not None else self.WIN_SCORE
+        self.depth = None
+        self.value = None
+        self.nodes = 0
+        self.stats = None
+        self.tree_factory = None
+        self.tree = None
+        self.stopped = False
+        self._tree = None
+        self._deadline = None
+        self._applied = 0
+
+    def stop(self):
+        """Makes the running search end at its next budget check. A search
+        started later runs in full."""
+        self.stopped = True
+        self._deadline = float('-inf')
+
+    def best_move(self, state, moves=None):
+        """Returns best of the moves (all legal ones by default) of the
+        player to move. The game must not be over."""
+        self.nodes = 0
+        moves = list(state.moves() if moves is None else moves)
+        remaining = state.remaining()
+        limited = self.time_limit is not None or self.node_limit is not None
+        # A stop made between searches is forgotten.
+        self.stopped = False
+        if not limited:
+            self._deadline = None
+        elif self.time_limit is not None:
+            self._deadline = perf_counter() + self.time_limit
+        else:
+            self._deadline = float('inf')
+        best_move, best, self.depth, tree = moves[0], None, 0, None
+        try:
+            for depth in range(1, remaining + 1) if limited else (remaining,):
+                move, value = self._root_search(state, moves, depth)
+                best_move, best, self.depth, tree = move, value, depth, self._tree
+                # Try the best move first at the next depth.
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(value) >= self.win_score:
+                    break
+        except _OutOfBudget:
+            while self._applied:
+                state.undo()
+                self._applied -= 1
+        finally:
+            self._deadline = None
+            self._tree = None
+        self.value = best
+        self.tree = tree
+        return best_move
+
+    def value_of(self, state, depth=None):
+        """Returns value of the position for the player to move searching
+        depth moves ahead, to the end by default: win_score and more if they
+        win, the sooner the more, minus that if they lose and 0 for a draw."""
+        self.nodes = 0
+        bound = self.win_score + state.remaining()
+        return self._negamax(state, -bound, bound,
+                             state.remaining() if depth is None else depth)
+
+    def move_value(self, state, move):
+        "Returns value of the move for the player making it, searching to the end."
+        self.nodes = 0
+        bound = self.win_score + state.remaining()
+        return self._move_value(state, move, -bound, bound, state.remaining())
+
+    def _root_search(self, state, moves, depth):
+        "Returns best of the moves and its value searching depth moves ahead."
+        self._tree = self.tree_factory() if self.tree_factory is not None else None
+        best_move, best = None, None
+        alpha = -self.win_score - state.remaining()
+        beta = self.win_score + state.remaining()
+        for move in moves:
+            value = self._move_value(state, move, alpha, beta, depth)
+            if best is None or value > best:
+                best_move, best = move, value
+                alpha = max(alpha, value)
+        return best_move, best
+
+    def _move_value(self, state, move, alpha, beta, depth):
+        """Returns value of the move for the player making it, searching
+        depth moves ahead including it."""
+        tree = self._tree
+        if tree is not None:
+            tree.enter(move)
+        state.apply(move)
+        self._applied += 1
+        stats = self.stats
+        if stats is not None:
+            stats.max_depth = max(stats.max_depth, self._applied)
+            start = perf_counter()
+        won = state.won()
+        drawn = not won and state.is_draw()
+        if stats is not None:
+            stats.win_detection_seconds += perf_counter() - start
+            stats.terminals += won or drawn
+        if won:
+            value = self.win_score + state.remaining()
+        elif drawn:
+            value = 0
+        else:
+            value = -self._negamax(state, -beta, -alpha, depth - 1)
+        state.undo()
+        self._applied -= 1
+        if tree is not None:
+            tree.leave(value)
+        return value
+
+    def _negamax(self, state, alpha, beta, depth):
+        """Returns value of the unfinished position for the player to move
+        within the alpha-beta window, searching depth moves ahead."""
+        self.nodes += 1
+        if self._deadline is not None:
+            if self.node_limit is not None and self.nodes > self.node_limit:
+                raise _OutOfBudget()
+            if not self.nodes & 255 and perf_counter() > self._deadline:
+                raise _OutOfBudget()
+        if depth <= 0:
+            return state.evaluate()
+        # Nobody can do better than winning with the next move.
+        best_possible = self.win_score + state.remaining() - 1
+        if beta > best_possible:
+            beta = best_possible
+            if alpha >= beta:
+                return beta
+        key = state.key()
+        entry = self.table.get(key)
+        stats = self.stats
+        if stats is not None:
+            start = perf_counter()
+        moves = state.moves()
+        if stats is not None:
+            stats.move_generation_seconds += perf_counter() - start
+        if entry is not None:
+            value, flag, move, draft = entry
+            if draft >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta or flag == UPPER and value <= alpha:
+                    return value
+            move = state.actual_move(move)
+            if move in moves:
+                moves.remove(move)
+                moves.insert(0, move)
+        alpha_start = alpha
+        best_move, best = None, None
+        for move in moves:
+            value = self._move_value(state, move, alpha, beta, depth)
+            if best is None or value > best:
+                best_move, best = move, value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        if stats is not None:
+                            stats.cutoffs += 1
+                        break
+        if best <= alpha_start:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(key, (best, flag, state.canonical_move(best_move), depth), depth)
+        return best
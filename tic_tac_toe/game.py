@@ -1,6 +1,5 @@
 from tic_tac_toe.tree import Node, Tree
 from tic_tac_toe.board import Board, Player, AI_Bot
-from copy import deepcopy
 
 
 class Game:
@@ -23,7 +22,7 @@ class Game:
         while not (self._board.have_winner() or self._board.is_draw()):
             self._board.show()
             cur_player = self._player_list[self._current_player]
-            self._board.make_move(cur_player.make_move(deepcopy(self._board)), cur_player.mark)
+            self._board.make_move(cur_player.make_move(self._board), cur_player.mark)
             self.change_cur_player()
         self.change_cur_player()
         self._board.show()
@@ -32,16 +31,27 @@ class Game:
         else:
             print("Winner is {}.".format(self._player_list[self._current_player].name))
 
+    def play(self):
+        """Plays the game to the end without any input or output.
+        Returns the winner or None for a draw."""
+        while not (self._board.have_winner() or self._board.is_draw()):
+            cur_player = self._player_list[self._current_player]
+            self._board.make_move(cur_player.make_move(self._board), cur_player.mark)
+            self.change_cur_player()
+        if self._board.is_draw():
+            return None
+        return self._player_list[1 - self._current_player]
+
 
 def main():
     "Sets up all main settings"
     pl1 = Player()
-    pl2 = AI_Bot("me")
-    pl1.set_mark('o')
-    pl2.set_mark('x')
-    board = Board()
-    g = Game(pl1, pl2, board)
-    g.routine()
+    with AI_Bot("me") as pl2:
+        pl1.set_mark('o')
+        pl2.set_mark('x')
+        board = Board()
+        g = Game(pl1, pl2, board)
+        g.routine()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+from array import array
+from math import log, sqrt
+from random import Random
+from time import perf_counter
+from tic_tac_toe.board import Player, MARKS
+
+# Node states: not checked yet, game goes on, won by the move into the node, draw.
+UNKNOWN, ONGOING, WON, DRAWN = -1, 0, 1, 2
+
+
+class MCTS_Bot(Player):
+    """Tic tac toe player choosing moves by Monte Carlo tree search.
+
+    Every playout walks down the tree choosing children by UCT, adds the
+    children of the reached node and finishes the game with random moves
+    on bit masks of the board. The move visited most often is made. The
+    search stops after playouts playouts or time_limit seconds, whichever
+    comes first, so a move costs about the same on any board size. At
+    least one playout is made, so that there is a move to choose.
+
+    Nodes are kept in flat arrays indexed by node number; children of a
+    node are numbered consecutively from first[node].
+    """
+
+    def __init__(self, *args, playouts=1000, time_limit=None, exploration=1.4, seed=None):
+        Player.__init__(self, *args)
+        if playouts < 1:
+            raise ValueError("At least one playout is needed to choose a move.")
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.random = Random(seed)
+        self.done = 0
+
+    def make_move(self, board):
+        "Returns the most visited move of the search."
+        geometry = board.geometry
+        lines = _line_masks(geometry)
+        cells = range(geometry.cells)
+        deadline = None if self.time_limit is None else perf_counter() + self.time_limit
+        root_mover = MARKS.index(self.mark)
+
+        parent = array('l', [-1])
+        move = array('l', [-1])
+        player = array('b', [1 - root_mover])
+        first = array('l', [0])
+        count = array('l', [0])
+        state = array('b', [ONGOING])
+        visits = array('l', [0])
+        wins = array('d', [0])
+
+        self.done = 0
+        while self.done < self.playouts:
+            bits = list(board.bits)
+            node = 0
+            # Selection.
+            while state[node] == ONGOING and count[node]:
+                log_visits = log(visits[node])
+                best, best_score = None, None
+                for child in range(first[node], first[node] + count[node]):
+                    if not visits[child]:
+                        best = child
+                        break
+                    score = (wins[child] / visits[child]
+                             + self.exploration * sqrt(log_visits / visits[child]))
+                    if best is None or score > best_score:
+                        best, best_score = child, score
+                node = best
+                bits[player[node]] |= 1 << move[node]
+                if state[node] == UNKNOWN:
+                    state[node] = _state(bits, player[node], move[node], lines, geometry.full)
+            # Expansion.
+            if state[node] == ONGOING and (visits[node] or not node):
+                occupied = bits[0] | bits[1]
+                first[node] = len(parent)
+                for cell in cells:
+                    if not occupied >> cell & 1:
+                        parent.append(node)
+                        move.append(cell)
+                        player.append(1 - player[node])
+                        first.append(0)
+                        count.append(0)
+                        state.append(UNKNOWN)
+                        visits.append(0)
+                        wins.append(0)
+                count[node] = len(parent) - first[node]
+                node = first[node]
+                bits[player[node]] |= 1 << move[node]
+                state[node] = _state(bits, player[node], move[node], lines, geometry.full)
+            # Simulation.
+            if state[node] == WON:
+                winner = player[node]
+            elif state[node] == DRAWN:
+                winner = None
+            else:
+                winner = self._playout(bits, 1 - player[node], lines, cells)
+            # Backpropagation.
+            while node >= 0:
+                visits[node] += 1
+                if winner is None:
+                    wins[node] += 0.5
+                elif winner == player[node]:
+                    wins[node] += 1
+                node = parent[node]
+            self.done += 1
+            # Checked after the first playout too, which expands the root.
+            if deadline is not None and self.done & 63 == 1 and perf_counter() > deadline:
+                break
+
+        best = max(range(first[0], first[0] + count[0]), key=lambda child: visits[child])
+        return geometry.moves[move[best]]
+
+    def _playout(self, bits, mover, lines, cells):
+        "Plays the game to the end randomly, returns index of the winner or None."
+        occupied = bits[0] | bits[1]
+        empty = [cell for cell in cells if not occupied >> cell & 1]
+        self.random.shuffle(empty)
+        for cell in empty:
+            bits[mover] |= 1 << cell
+            for mask in lines[cell]:
+                if bits[mover] & mask == mask:
+                    return mover
+            mover = 1 - mover
+        return None
+
+
+def _state(bits, mover, cell, lines, full):
+    "Returns state of the game after mover has played on the cell."
+    for mask in lines[cell]:
+        if bits[mover] & mask == mask:
+            return WON
+    if bits[0] | bits[1] == full:
+        return DRAWN
+    return ONGOING
+
+
+_masks = {}
+
+
+def _line_masks(geometry):
+    "Returns bit masks of the winning lines through every cell."
+    if geometry not in _masks:
+        masks = [sum(1 << cell for cell in line) for line in geometry.lines]
+        _masks[geometry] = tuple(tuple(masks[line] for line in through)
+                                 for through in geometry.lines_through)
+    return _masks[geometry]
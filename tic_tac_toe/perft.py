@@ -0,0 +1,138 @@
+"""Perft: counts of the positions reachable from a board, made with
+Board.available_moves, make_move and undo_move only.
+
+Counts of a board representation which is correct must agree with those of
+this one, e.g. for the empty 3x3 board to depth 9 there are 255168 games,
+131184 won by 'x', 77904 by 'o' and 46080 drawn. Timing them measures the
+speed of move generation alone:
+
+    python -m tic_tac_toe.perft 3 3 9 --divide
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from time import perf_counter
+from tic_tac_toe.board import Board, MARKS, other_mark, format_move
+
+
+def perft(board, depth, mark=None):
+    """Returns counts of the games from the board going depth moves ahead
+    as a dictionary: 'leaves' are the positions depth moves ahead and the
+    games finished sooner, 'wins' the numbers of those games won by each
+    mark and 'draws' of those drawn. mark is the player to move, the one
+    who did not make the last move by default."""
+    if mark is None:
+        mark = _mark_to_move(board)
+    counts = [0, 0, 0, 0]
+    if board.have_winner():
+        counts[1 + MARKS.index(board.last_sign)] += 1
+        counts[0] += 1
+    elif board.is_draw():
+        counts[3] += 1
+        counts[0] += 1
+    else:
+        _count(board, mark, depth, counts)
+    return _result(counts)
+
+
+def divide(board, depth, mark=None, workers=None):
+    """Returns perft counts of the position after every move from the board
+    to depth - 1 by move. With workers set the moves are counted in
+    parallel by that many processes."""
+    if mark is None:
+        mark = _mark_to_move(board)
+    moves = board.available_moves()
+    if workers is None:
+        results = []
+        for move in moves:
+            board.make_move(move, mark)
+            results.append(perft(board, depth - 1, other_mark(mark)))
+            board.undo_move()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_move_perft, repeat(board.encode()), moves,
+                                        repeat(mark), repeat(depth)))
+    return dict(zip(moves, results))
+
+
+def total(results):
+    "Returns sum of perft counts, e.g. of those returned by divide."
+    counts = [0, 0, 0, 0]
+    for result in results:
+        counts[0] += result['leaves']
+        counts[1] += result['wins'][MARKS[0]]
+        counts[2] += result['wins'][MARKS[1]]
+        counts[3] += result['draws']
+    return _result(counts)
+
+
+def _count(board, mark, depth, counts):
+    """Adds counts of the games from the unfinished board to counts:
+    [leaves, wins of MARKS[0], wins of MARKS[1], draws]."""
+    if depth <= 0:
+        counts[0] += 1
+        return
+    index = MARKS.index(mark)
+    opponent = other_mark(mark)
+    for move in board.available_moves():
+        board.make_move(move, mark)
+        if board.have_winner():
+            counts[0] += 1
+            counts[1 + index] += 1
+        elif board.is_draw():
+            counts[0] += 1
+            counts[3] += 1
+        else:
+            _count(board, opponent, depth - 1, counts)
+        board.undo_move()
+
+
+def _move_perft(code, move, mark, depth):
+    "Returns perft counts after the move from the encoded board, run by workers."
+    board = Board.decode(code)
+    board.make_move(move, mark)
+    return perft(board, depth - 1, other_mark(mark))
+
+
+def _mark_to_move(board):
+    "Returns mark of the player who did not make the last move."
+    return MARKS[0] if board.last_sign is None else other_mark(board.last_sign)
+
+
+def _result(counts):
+    "Returns dictionary of the counts list."
+    return {'leaves': counts[0], 'wins': {MARKS[0]: counts[1], MARKS[1]: counts[2]},
+            'draws': counts[3]}
+
+
+def main():
+    "Counts positions of the empty board given by command line arguments."
+    parser = argparse.ArgumentParser(description="Count tic tac toe positions.")
+    parser.add_argument('size', type=int)
+    parser.add_argument('k', type=int)
+    parser.add_argument('depth', type=int)
+    parser.add_argument('--divide', action='store_true', help="print counts by first move")
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    board = Board(args.size, args.k)
+    start = perf_counter()
+    if args.divide or args.workers is not None:
+        results = divide(board, args.depth, workers=args.workers)
+        result = total(results.values())
+    else:
+        results, result = {}, perft(board, args.depth)
+    seconds = perf_counter() - start
+    if args.divide:
+        for move, counts in results.items():
+            print("{:>4} {}".format(format_move(move), counts['leaves']))
+    print("leaves: {}".format(result['leaves']))
+    for mark, wins in result['wins'].items():
+        print("{} wins: {}".format(mark, wins))
+    print("draws: {}".format(result['draws']))
+    print("seconds: {:.3f}, leaves per second: {:.0f}".format(
+        seconds, result['leaves'] / seconds if seconds else 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import threading
+from tic_tac_toe.board import other_mark
+
+
+class Ponderer:
+    """Searches the positions after likely replies of the opponent in a
+    background thread while the opponent thinks, for the bot to answer
+    them at once.
+
+    The searches are done by a helper bot with the settings and the
+    transposition table of the bot, so positions the thread did not get to
+    are found faster too. The bot must not search while the thread runs:
+    stop it first.
+    """
+
+    def __init__(self, bot):
+        self.helper = type(bot)(bot.name, table=bot.table, mode=bot.mode,
+                                time_limit=bot.time_limit, node_limit=bot.node_limit,
+                                evaluate=bot.evaluate)
+        self.helper.set_mark(bot.mark)
+        # Best moves and search depths by position (bits of both players).
+        self.results = {}
+        self._thread = None
+        self._stopped = False
+
+    def start(self, board, move):
+        """Starts pondering on the position after the move of the bot on the
+        board, which is left unchanged."""
+        self.stop()
+        self.results = {}
+        position = board.decode(board.encode())
+        position.make_move(move, self.helper.mark)
+        if position.have_winner() or position.is_draw():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, args=(position,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        "Stops the search and waits for the thread to finish."
+        if self._thread is None:
+            return
+        self._stopped = True
+        # The helper may start one more search before the thread sees
+        # _stopped, which clears the stop of the engine: stop it again.
+        while self._thread.is_alive():
+            self.helper.engine.stop()
+            self._thread.join(0.01)
+        self._thread = None
+
+    def lookup(self, board):
+        "Returns (move, depth) found for the board or None."
+        return self.results.get(tuple(board.bits))
+
+    def _run(self, board):
+        "Searches the positions after every reply in the order of ordered_moves."
+        helper = self.helper
+        opponent = other_mark(helper.mark)
+        for reply in board.ordered_moves():
+            if self._stopped:
+                return
+            board.make_move(reply, opponent)
+            if not (board.have_winner() or board.is_draw()):
+                move = helper.make_move(board)
+                # Depth 0: stopped before any depth was completed.
+                if self._stopped or not helper.depth:
+                    return
+                self.results[tuple(board.bits)] = (move, helper.depth)
+            board.undo_move()
@@ -0,0 +1,152 @@
+"""Compact binary records of played games.
+
+A file starts with FILE_HEADER and holds records appended one after
+another. Every record is RECORD_HEADER (board size, k, flags, number of
+moves and byte lengths of the names), the UTF-8 names of the player who
+moved first and of the other one, and the moves: cell numbers row * size +
+col packed into cell_bits(size) bits each, lowest bits first, padded to
+whole bytes. Flags hold the result in the lowest two bits and whether
+MARKS[1] moved first in the third one.
+
+    with RecordWriter('games.bin') as writer:
+        writer.write(board, ('me', 'bot'))
+    for record in read_records('games.bin'):
+        print(record.names, record.winner)
+        record.board(5).show()
+"""
+
+import struct
+from tic_tac_toe.board import Board, MARKS, other_mark
+
+FILE_HEADER = struct.Struct('<4sB')
+MAGIC = b'TTTR'
+VERSION = 1
+RECORD_HEADER = struct.Struct('<BBBHBB')
+# Results: game not finished, won by the player who moved first or by the
+# other one, draw.
+UNFINISHED, FIRST_WON, SECOND_WON, DRAW = 0, 1, 2, 3
+SECOND_FIRST = 4
+
+
+def cell_bits(size):
+    "Returns number of bits of a move on size x size board."
+    return max(1, (size * size - 1).bit_length())
+
+
+class GameRecord:
+    "Game read from a record file."
+
+    def __init__(self, size, k, names, first_mark, result, cells):
+        self.size = size
+        self.k = k
+        self.names = names
+        self.first_mark = first_mark
+        self.result = result
+        # Cell numbers of the moves in the order they were made.
+        self.cells = cells
+
+    @property
+    def moves(self):
+        "Returns list of moves as (row, col) tuples."
+        return [divmod(cell, self.size) for cell in self.cells]
+
+    @property
+    def winner(self):
+        "Returns mark of the winner or None for a draw or unfinished game."
+        if self.result == FIRST_WON:
+            return self.first_mark
+        if self.result == SECOND_WON:
+            return other_mark(self.first_mark)
+        return None
+
+    def board(self, ply=None):
+        "Returns board after the first ply moves, after all by default."
+        board = Board(self.size, self.k)
+        mark = self.first_mark
+        for cell in self.cells[:ply]:
+            board.make_move(divmod(cell, self.size), mark)
+            mark = other_mark(mark)
+        return board
+
+    def replay(self):
+        """Yields board after every move, starting with the empty one. The
+        same board is yielded every time, changed by one move."""
+        board = Board(self.size, self.k)
+        yield board
+        mark = self.first_mark
+        for cell in self.cells:
+            board.make_move(divmod(cell, self.size), mark)
+            mark = other_mark(mark)
+            yield board
+
+
+class RecordWriter:
+    "Appends records of games to the file at path, creating it if needed."
+
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, board, names=('', '')):
+        """Appends record of the game played on the board, names being those
+        of the player who moved first and of the other one."""
+        if not board.history:
+            raise ValueError("Game has no moves to record.")
+        size = board.size
+        moves = len(board.history)
+        first_mark = board.last_sign if moves % 2 else other_mark(board.last_sign)
+        if board.have_winner():
+            result = FIRST_WON if board.last_sign == first_mark else SECOND_WON
+        elif board.is_draw():
+            result = DRAW
+        else:
+            result = UNFINISHED
+        flags = result | (SECOND_FIRST if first_mark == MARKS[1] else 0)
+        names = [name.encode() for name in names]
+        if max(len(name) for name in names) > 255:
+            raise ValueError("Names can take at most 255 bytes.")
+        bits = cell_bits(size)
+        packed = 0
+        for number, (row, col) in enumerate(board.history):
+            packed |= (row * size + col) << (number * bits)
+        self.file.write(RECORD_HEADER.pack(size, board.k, flags, moves, len(names[0]),
+                                           len(names[1])))
+        self.file.write(names[0] + names[1])
+        self.file.write(packed.to_bytes((moves * bits + 7) // 8, 'little'))
+
+    def close(self):
+        "Closes the file."
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_records(path):
+    "Yields records of the file one by one without reading it all at once."
+    with open(path, 'rb') as file:
+        header = file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (MAGIC, VERSION):
+            raise ValueError("Not a game record file: {}.".format(path))
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError("Truncated record in {}.".format(path))
+            size, k, flags, moves, length1, length2 = RECORD_HEADER.unpack(header)
+            bits = cell_bits(size)
+            length = (moves * bits + 7) // 8
+            data = file.read(length1 + length2 + length)
+            if len(data) < length1 + length2 + length:
+                raise ValueError("Truncated record in {}.".format(path))
+            names = (data[:length1].decode(), data[length1:length1 + length2].decode())
+            packed = int.from_bytes(data[length1 + length2:], 'little')
+            mask = (1 << bits) - 1
+            cells = [packed >> (number * bits) & mask for number in range(moves)]
+            yield GameRecord(size, k, names, MARKS[1] if flags & SECOND_FIRST else MARKS[0],
+                             flags & 3, cells)
@@ -0,0 +1,95 @@
+"""Headless self-play: plays many games between bots without any input or
+output, in parallel processes, and reports results and throughput.
+
+Players are given as (kind, options) pairs, kind being a key of PLAYERS
+and options keyword arguments of its class, e.g. ('ai', {'mode': 'sum'})
+or ('random', {}). Every process keeps its players for all its games.
+
+    python -m tic_tac_toe.selfplay ai random 1000
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from tic_tac_toe.board import Board, AI_Bot, RandomBot, MARKS
+from tic_tac_toe.game import Game
+from tic_tac_toe.mcts import MCTS_Bot
+
+PLAYERS = {'ai': AI_Bot, 'random': RandomBot, 'mcts': MCTS_Bot}
+
+
+def make_player(spec, name, mark):
+    "Returns player made from (kind, options) spec."
+    kind, options = spec
+    if kind not in PLAYERS:
+        raise ValueError("Unknown player kind: {}.".format(kind))
+    player = PLAYERS[kind](name, **options)
+    player.set_mark(mark)
+    return player
+
+
+def play_games(player1, player2, first_game, count, size=3, k=None, seed=0):
+    """Plays games with numbers from first_game to first_game + count.
+    Player 1 moves first in even games, player 2 in odd ones; players
+    making random choices are reseeded from seed and the game number
+    before each game.
+    Returns (player 1 wins, player 2 wins, draws, moves)."""
+    with make_player(player1, 'player 1', MARKS[0]) as first, \
+            make_player(player2, 'player 2', MARKS[1]) as second:
+        players = [first, second]
+        wins = [0, 0]
+        draws = moves = 0
+        for number in range(first_game, first_game + count):
+            for index, player in enumerate(players):
+                if hasattr(player, 'random'):
+                    player.random.seed(seed * 1000003 + 2 * number + index)
+            order = players if number % 2 == 0 else players[::-1]
+            board = Board(size, k)
+            winner = Game(order[0], order[1], board).play()
+            if winner is None:
+                draws += 1
+            else:
+                wins[players.index(winner)] += 1
+            moves += len(board.history)
+    return wins[0], wins[1], draws, moves
+
+
+def run_tournament(player1, player2, games=1000, size=3, k=None, workers=None,
+                   batch=50, seed=0):
+    """Plays games between the players in batches spread over a process
+    pool of workers (one process per CPU by default). Returns dictionary
+    with numbers of wins of both players, draws and moves, time spent and
+    games and moves per second."""
+    start = perf_counter()
+    totals = [0, 0, 0, 0]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_games, player1, player2, first,
+                                   min(batch, games - first), size, k, seed)
+                   for first in range(0, games, batch)]
+        for future in futures:
+            for index, value in enumerate(future.result()):
+                totals[index] += value
+    seconds = perf_counter() - start
+    return {'games': games, 'player1_wins': totals[0], 'player2_wins': totals[1],
+            'draws': totals[2], 'moves': totals[3], 'seconds': seconds,
+            'games_per_second': games / seconds, 'moves_per_second': totals[3] / seconds}
+
+
+def main():
+    "Runs tournament given by command line arguments and prints its results."
+    parser = argparse.ArgumentParser(description="Play tic tac toe bots against each other.")
+    parser.add_argument('player1', choices=PLAYERS)
+    parser.add_argument('player2', choices=PLAYERS)
+    parser.add_argument('games', type=int)
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--k', type=int)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    result = run_tournament((args.player1, {}), (args.player2, {}), args.games,
+                            args.size, args.k, args.workers)
+    for key, value in result.items():
+        print("{}: {}".format(key, round(value, 2) if isinstance(value, float) else value))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Asyncio server hosting many tic tac toe games against AI_Bot at once.
+
+Every connection is one session speaking a line protocol:
+
+    NEW [SIZE [K [MARK]]]  start a game, MARK is the client's one ('x'
+                           moves first), 'x' by default; answers
+                           "OK SIZE K MARK" and the bot's move if it
+                           starts
+    MOVE A1                make a move; answers "MOVE B2" with the
+                           bot's reply and "END WIN", "END LOSS" or
+                           "END DRAW" once the game is over
+    STATS                  answers "STATS" followed by key=value pairs
+                           of server metrics and, after NEW, of bot
+                           moves of the session's game prefixed 'game_'
+    QUIT                   close the session
+
+Errors are answered with "ERR message". Bot moves are computed in an
+executor, so the event loop keeps serving other sessions meanwhile, and
+at most max_pending of them wait for it at once. The bot gets
+DEFAULT_TIME_LIMIT seconds per move unless told otherwise; a bot without a
+time or node limit plays on boards up to UNLIMITED_SIZE only.
+
+    python -m tic_tac_toe.server --port 8765
+"""
+
+import argparse
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from tic_tac_toe.board import Board, AI_Bot, other_mark, parse_move, format_move
+
+
+DEFAULT_TIME_LIMIT = 1.0
+# Biggest board a bot searching to the end answers on in a moment.
+UNLIMITED_SIZE = 4
+
+# Bots of executor threads or processes by mark and options.
+_local = threading.local()
+
+
+def _bot_move(code, mark, options):
+    "Returns move of the bot for the encoded position, run in the executor."
+    if not hasattr(_local, 'bots'):
+        _local.bots = {}
+    key = (mark, tuple(sorted(options.items())))
+    if key not in _local.bots:
+        _local.bots[key] = AI_Bot('server', **options)
+        _local.bots[key].set_mark(mark)
+    return _local.bots[key].make_move(Board.decode(code))
+
+
+def _latency_stats(latencies):
+    "Returns dictionary of statistics of the latencies, in milliseconds."
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+    return {'mean_ms': 1000 * sum(latencies) / len(latencies),
+            'p50_ms': 1000 * latencies[len(latencies) // 2],
+            'p99_ms': 1000 * latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)],
+            'max_ms': 1000 * latencies[-1]}
+
+
+class Session:
+    "State of a game played over one connection."
+
+    def __init__(self, size, k, mark):
+        self.board = Board(size, k)
+        self.mark = mark
+        self.bot_mark = other_mark(mark)
+        # Latencies in seconds of the bot moves of the game.
+        self.latencies = []
+
+    def stats(self):
+        "Returns dictionary of metrics of the bot moves of the game."
+        result = {'moves': len(self.latencies)}
+        result.update(_latency_stats(self.latencies))
+        return result
+
+    def result(self):
+        "Returns 'WIN', 'LOSS' or 'DRAW' for the client if the game is over, or None."
+        if self.board.have_winner():
+            return 'WIN' if self.board.last_sign == self.mark else 'LOSS'
+        if self.board.is_draw():
+            return 'DRAW'
+        return None
+
+
+class GameServer:
+    """Serves sessions on host and port (0 picks a free port, see
+    self.port after start). Bot moves are computed by executor, a thread
+    pool by default; bot_options are keyword arguments of AI_Bot, a time
+    limit of DEFAULT_TIME_LIMIT by default."""
+
+    def __init__(self, host='127.0.0.1', port=0, bot_options=None, executor=None,
+                 max_sessions=10000, max_pending=64, latency_window=10000):
+        self.host = host
+        self.port = port
+        self.bot_options = (bot_options if bot_options is not None
+                            else {'time_limit': DEFAULT_TIME_LIMIT})
+        self.executor = executor if executor is not None else ThreadPoolExecutor()
+        self.max_sessions = max_sessions
+        self.sessions = 0
+        self.games = 0
+        self.moves = 0
+        # Latencies in seconds of the latest bot moves, for percentiles.
+        self.latencies = deque(maxlen=latency_window)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._server = None
+
+    async def start(self):
+        "Starts listening."
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        "Starts listening and serves until cancelled."
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        "Stops listening."
+        self._server.close()
+        await self._server.wait_closed()
+
+    def stats(self):
+        "Returns dictionary of server metrics, latencies in milliseconds."
+        result = {'sessions': self.sessions, 'games': self.games, 'moves': self.moves}
+        result.update(_latency_stats(self.latencies))
+        return result
+
+    async def _handle(self, reader, writer):
+        "Serves one connection."
+        if self.sessions >= self.max_sessions:
+            writer.write(b"ERR server is busy\n")
+            await writer.drain()
+            writer.close()
+            return
+        self.sessions += 1
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode(errors='replace').split()
+                if not words:
+                    continue
+                command = words[0].upper()
+                if command == 'QUIT':
+                    break
+                try:
+                    if command == 'NEW':
+                        session = self._new_session(words[1:])
+                        replies = ["OK {} {} {}".format(session.board.size, session.board.k,
+                                                        session.mark)]
+                        if session.mark != 'x':
+                            # Let the client know the game started while the bot thinks.
+                            writer.write((replies[0] + "\n").encode())
+                            await writer.drain()
+                            replies = await self._bot_turn(session)
+                    elif command == 'MOVE':
+                        replies = await self._client_move(session, words[1:])
+                    elif command == 'STATS':
+                        stats = self.stats()
+                        if session is not None:
+                            stats.update(('game_' + key, value)
+                                         for key, value in session.stats().items())
+                        replies = ["STATS " + " ".join(
+                            "{}={}".format(key, round(value, 3)) for key, value in stats.items())]
+                    else:
+                        raise ValueError("Unknown command.")
+                except ValueError as e:
+                    replies = ["ERR {}".format(e)]
+                writer.write("".join(reply + "\n" for reply in replies).encode())
+                # Stop reading from clients which do not read the answers.
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    def _new_session(self, args):
+        "Returns session made from arguments of NEW command."
+        if len(args) > 3:
+            raise ValueError("NEW takes at most size, k and mark.")
+        try:
+            size = int(args[0]) if args else 3
+            k = int(args[1]) if len(args) > 1 else size
+        except ValueError:
+            raise ValueError("Size and k have to be numbers.")
+        mark = args[2].lower() if len(args) > 2 else 'x'
+        if mark not in ('x', 'o'):
+            raise ValueError("Mark has to be 'x' or 'o'.")
+        if not 0 < size <= 26:
+            raise ValueError("Size has to be between 1 and 26.")
+        if (size > UNLIMITED_SIZE and self.bot_options.get('time_limit') is None
+                and self.bot_options.get('node_limit') is None):
+            raise ValueError("Size has to be at most {} for a bot without limits.".format(
+                UNLIMITED_SIZE))
+        self.games += 1
+        return Session(size, k, mark)
+
+    async def _client_move(self, session, args):
+        "Makes client's move and bot's reply, returns answer lines."
+        if session is None or session.result() is not None:
+            raise ValueError("Start a new game first.")
+        if len(args) != 1:
+            raise ValueError("MOVE takes one move like A1.")
+        move = parse_move(args[0], session.board.size)
+        if move not in session.board.available_moves():
+            raise ValueError("This move has been done earlier.")
+        session.board.make_move(move, session.mark)
+        self.moves += 1
+        if session.result() is not None:
+            return ["END " + session.result()]
+        return await self._bot_turn(session)
+
+    async def _bot_turn(self, session):
+        "Makes bot's move in the executor, returns answer lines."
+        start = perf_counter()
+        async with self._pending:
+            move = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _bot_move, session.board.encode(), session.bot_mark,
+                self.bot_options)
+        latency = perf_counter() - start
+        session.latencies.append(latency)
+        self.latencies.append(latency)
+        self.moves += 1
+        session.board.make_move(move, session.bot_mark)
+        replies = ["MOVE " + format_move(move)]
+        if session.result() is not None:
+            replies.append("END " + session.result())
+        return replies
+
+
+def main():
+    "Runs the server with settings from command line arguments."
+    parser = argparse.ArgumentParser(description="Serve tic tac toe games against AI_Bot.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT,
+                        help="seconds per bot move, 0 to search to the end on small boards")
+    args = parser.parse_args()
+    options = {'time_limit': args.time_limit} if args.time_limit else {}
+    server = GameServer(args.host, args.port, options)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
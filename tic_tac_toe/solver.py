@@ -0,0 +1,165 @@
+"""Retrograde solver computing exact values of all tic tac toe positions.
+
+A position is numbered by its base 3 index: digit of the cell row * size +
+col is 0 if it is empty, 1 for the mark of the player who moved first and
+2 for the other one. The value of the position for the player to move is
+stored as int8: 0 for a draw, 1 + number of cells left empty at the end
+for a win and minus that for a loss. Positions which can not appear in a
+game are marked with UNREACHABLE.
+
+Values are computed bottom-up straight into a memory-mapped file, a block
+of positions at a time, so memory use does not depend on the board size:
+
+    python -m tic_tac_toe.solver 4 4 tic_tac_toe_4x4.bin
+"""
+
+import struct
+import sys
+import numpy as np
+from tic_tac_toe.board import Geometry, MARKS, other_mark
+
+UNREACHABLE = -128
+# File header: magic, format version, board size and winning row length.
+HEADER = struct.Struct('<4sBBBx')
+MAGIC = b'TTTV'
+VERSION = 1
+
+
+def solve(path, size=3, k=None, block_power=10):
+    """Computes values of all positions of size x size board with k in a
+    row to win and writes them to path. Positions are processed in blocks
+    of 3 ** block_power."""
+    geometry = Geometry.get(size, size if k is None else k)
+    cells = geometry.cells
+    total = 3 ** cells
+    powers = 3 ** np.arange(cells, dtype=np.int64)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, geometry.k))
+    values = np.memmap(path, dtype=np.int8, mode='r+', offset=HEADER.size, shape=(total,))
+    block = 3 ** min(block_power, cells)
+    # Every move adds to the index, so children are always numbered higher
+    # than their parent: blocks are solved from the top down, and inside a
+    # block positions with more marks first.
+    for start in range(total - block, -1, -block):
+        _solve_block(values, geometry, powers, start, start + block)
+    values.flush()
+    del values
+
+
+def _solve_block(values, geometry, powers, start, stop):
+    "Computes values of positions with indices from start to stop."
+    index = np.arange(start, stop, dtype=np.int64)
+    digits = ((index[:, None] // powers) % 3).astype(np.int8)
+    first = digits == 1
+    second = digits == 2
+    n_first = first.sum(axis=1)
+    n_second = second.sum(axis=1)
+    first_moves = n_first == n_second
+    valid = first_moves | (n_first == n_second + 1)
+
+    first_won = np.zeros(len(index), dtype=bool)
+    second_won = np.zeros(len(index), dtype=bool)
+    for line in geometry.lines:
+        line = list(line)
+        first_won |= first[:, line].all(axis=1)
+        second_won |= second[:, line].all(axis=1)
+    mover_won = np.where(first_moves, first_won, second_won)
+    last_won = np.where(first_moves, second_won, first_won)
+    valid &= ~mover_won
+
+    empty = geometry.cells - n_first - n_second
+    result = np.full(len(index), UNREACHABLE, dtype=np.int8)
+    result[valid & last_won] = -(empty[valid & last_won] + 1)
+    result[valid & ~last_won & (empty == 0)] = 0
+    values[start:stop] = result
+
+    open_positions = valid & ~last_won & (empty > 0)
+    mover_digit = np.where(first_moves, 1, 2)
+    marks = n_first + n_second
+    for level in range(geometry.cells - 1, -1, -1):
+        at_level = np.flatnonzero(open_positions & (marks == level))
+        if not len(at_level):
+            continue
+        best = np.full(len(at_level), -geometry.cells - 1, dtype=np.int16)
+        for cell in range(geometry.cells):
+            free = at_level[digits[at_level, cell] == 0]
+            if not len(free):
+                continue
+            children = index[free] + mover_digit[free] * powers[cell]
+            scores = -values[children].astype(np.int16)
+            position = np.searchsorted(at_level, free)
+            best[position] = np.maximum(best[position], scores)
+        values[start + at_level] = best.astype(np.int8)
+
+
+class PositionTable:
+    """Values of all positions of one board geometry read from a file made
+    by solve. The file is memory-mapped on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            magic, version, self.size, self.k = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a position value file.".format(path))
+        self.geometry = Geometry.get(self.size, self.k)
+        self._powers = tuple(3 ** cell for cell in range(self.geometry.cells))
+        self._values = None
+
+    @property
+    def values(self):
+        "Returns array of values of all positions."
+        if self._values is None:
+            self._values = np.memmap(self.path, dtype=np.int8, mode='r', offset=HEADER.size,
+                                     shape=(3 ** self.geometry.cells,))
+        return self._values
+
+    def index(self, board, mark):
+        "Returns index of the position with the player with mark to move."
+        if board.geometry is not self.geometry:
+            raise ValueError("The table is made for {0}x{0} board with {1} in a row.".format(
+                self.size, self.k))
+        mine = board.bits[MARKS.index(mark)]
+        theirs = board.bits[MARKS.index(other_mark(mark))]
+        # The player to move is the first one if both have made as many moves.
+        if bin(mine).count('1') == bin(theirs).count('1'):
+            first, second = mine, theirs
+        else:
+            first, second = theirs, mine
+        index = 0
+        for cell, power in enumerate(self._powers):
+            if first >> cell & 1:
+                index += power
+            elif second >> cell & 1:
+                index += 2 * power
+        return index
+
+    def value(self, board, mark):
+        "Returns value of the position for the player with mark to move."
+        return int(self.values[self.index(board, mark)])
+
+    def best_move(self, board, mark):
+        "Returns move of the player with mark leading to the best value."
+        best_move, best = None, None
+        for move in board.ordered_moves():
+            board.make_move(move, mark)
+            if board.have_winner():
+                value = board.count_empty() + 1
+            else:
+                value = -self.value(board, other_mark(mark))
+            board.undo_move()
+            if best is None or value > best:
+                best_move, best = move, value
+        return best_move
+
+
+def main():
+    "Solves board given by command line arguments: size, k and output path."
+    if len(sys.argv) != 4:
+        print("Usage: python -m tic_tac_toe.solver SIZE K OUTPUT")
+        return
+    solve(sys.argv[3], int(sys.argv[1]), int(sys.argv[2]))
+
+
+if __name__ == "__main__":
+    main()
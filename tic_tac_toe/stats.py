@@ -0,0 +1,37 @@
+class SearchStats:
+    """Statistics of the search of one move by AI_Bot.
+
+    nodes counts searched positions, terminals the won and drawn ones
+    reached, max_depth the deepest ply below the root, hits and misses the
+    lookups of the transposition table and cutoffs the positions whose
+    search stopped at the beta bound. Times are in seconds: all of the
+    move, spent listing moves and spent checking for a win or a draw.
+    pondered is True if the move was found by pondering, before make_move
+    was called, and the counts are then 0.
+    """
+
+    FIELDS = ('move', 'pondered', 'nodes', 'terminals', 'max_depth', 'hits', 'misses', 'cutoffs',
+              'seconds', 'move_generation_seconds', 'win_detection_seconds')
+
+    def __init__(self):
+        self.move = None
+        self.pondered = False
+        self.nodes = 0
+        self.terminals = 0
+        self.max_depth = 0
+        self.hits = 0
+        self.misses = 0
+        self.cutoffs = 0
+        self.seconds = 0.0
+        self.move_generation_seconds = 0.0
+        self.win_detection_seconds = 0.0
+
+    def as_dict(self):
+        "Returns dictionary of the statistics, e.g. for JSON logs."
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __str__(self):
+        "Returns statistics as one line of key=value pairs."
+        return " ".join("{}={}".format(field, round(value, 6) if isinstance(value, float)
+                                       else value)
+                        for field, value in self.as_dict().items())
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+# Kinds of stored search values: exact, or only a lower or upper bound after
+# an alpha-beta cutoff.
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """Bounded cache of searched positions keyed by Zobrist hash.
+
+    Policy 'lru' evicts the least recently used entry once the table is
+    full. Policy 'depth' keeps a fixed array of slots indexed by the key
+    and replaces an entry only with one of at least the same draft, so
+    results of bigger subtrees survive. One table can be kept by a bot
+    for the whole game; hits and misses count every lookup.
+    """
+
+    POLICIES = ('lru', 'depth')
+
+    def __init__(self, capacity=2 ** 16, policy='lru'):
+        if capacity <= 0:
+            raise ValueError("Capacity has to be positive.")
+        if policy not in self.POLICIES:
+            raise ValueError("Unknown replacement policy: {}.".format(policy))
+        self.capacity = capacity
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.clear()
+
+    def __len__(self):
+        "Returns number of stored entries."
+        if self.policy == 'lru':
+            return len(self._entries)
+        return self.capacity - self._slots.count(None)
+
+    def clear(self):
+        "Removes all entries and resets counters."
+        self._entries = OrderedDict()
+        self._slots = [None] * self.capacity if self.policy == 'depth' else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        "Returns value stored for key or None."
+        if self.policy == 'lru':
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+        slot = self._slots[key % self.capacity]
+        if slot is None or slot[0] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return slot[2]
+
+    def put(self, key, value, draft=0):
+        """Stores value for key. Draft is the size of the searched subtree,
+        e.g. number of empty cells, and is used by the 'depth' policy."""
+        if self.policy == 'lru':
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            return
+        index = key % self.capacity
+        slot = self._slots[index]
+        if slot is None or slot[0] == key or draft >= slot[1]:
+            self._slots[index] = (key, draft, value)
@@ -1,3 +1,6 @@
+from array import array
+
+
 class Tree:
     """Simple representation of Tree data structure"""
 
@@ -18,3 +21,68 @@ class Node:
         self.children = []
         self.data = data
         self.score = 0
+
+
+class SearchTree:
+    """Compact record of a searched game tree down to a given depth.
+
+    Node 0 is the searched position, other nodes are numbered in the order
+    the search entered them. For every node the arrays keep index of its
+    parent, the cell its move was made on (row * size + col) and its score.
+    """
+    __slots__ = ('max_depth', 'size', 'parents', 'cells', 'scores', '_path', '_skipped')
+
+    def __init__(self, max_depth, size):
+        self.max_depth = max_depth
+        self.size = size
+        self.parents = array('l', [-1])
+        self.cells = array('l', [-1])
+        self.scores = array('d', [0])
+        self._path = [0]
+        self._skipped = 0
+
+    def __len__(self):
+        return len(self.parents)
+
+    def enter(self, move):
+        "Records a move from the current node and makes it current."
+        if self._skipped or len(self._path) > self.max_depth:
+            self._skipped += 1
+            return
+        self._path.append(len(self.parents))
+        self.parents.append(self._path[-2])
+        self.cells.append(move[0] * self.size + move[1])
+        self.scores.append(0)
+
+    def leave(self, score):
+        "Sets score of the current node and goes back to its parent."
+        if self._skipped:
+            self._skipped -= 1
+            return
+        self.scores[self._path.pop()] = score
+
+    def move(self, index):
+        "Returns move leading to the node as (row, col)."
+        return divmod(self.cells[index], self.size)
+
+    def children(self, index):
+        "Returns indices of children of the node."
+        return [child for child, parent in enumerate(self.parents) if parent == index]
+
+    def __str__(self):
+        """Returns a string representation with every node on its own line,
+        indented by its depth."""
+        lines = []
+        # Children of every node, listed once instead of by children.
+        children = [[] for parent in self.parents]
+        for child in range(1, len(self.parents)):
+            children[self.parents[child]].append(child)
+
+        def recurse(index, level):
+            lines.append("| " * level + "{} {:g}".format(
+                self.move(index) if index else "root", self.scores[index]))
+            for child in children[index]:
+                recurse(child, level + 1)
+
+        recurse(0, 0)
+        return "\n".join(lines)